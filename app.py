@@ -1,7 +1,6 @@
 import streamlit as st
 import datetime
 import warnings
-import pandas as pd
 from paths import Path
 from pandas_profiling import ProfileReport
 from streamlit_pandas_profiling import st_profile_report
@@ -11,26 +10,26 @@ from catboost import CatBoostRegressor
 from xgboost import XGBRegressor
 from lightgbm import LGBMRegressor
 from src.data.preprocess_data import *
-from src.features.feature_engineering import date_engineering
-from src.models.hyperparameter_optimize import optuna_optimize
+from src.features.feature_engineering import date_engineering, date_feature_names
+from src.models.hyperparameter_optimize import optuna_optimize, build_study_name
+from src.models.fold_cache import FoldMatrixCache
+from src.models.model_registry import ModelRegistry
+from src.data.feature_store import FeatureStore
+from src.data.stage_cache import StageCache
+from src.data.dataset_source import load_panel
+from src.data.memory_report import MemoryReport
+from src.data.stage_tracer import StageTracer
+from src.data.partitioned_pipeline import PartitionedPipeline
 
 warnings.filterwarnings("ignore")
-st.set_page_config(page_title="End_To_End_Advanced_Multiple_Time_Series_Regression",
-                   page_icon="chart_with_upwards_trend", layout="wide")
-st.markdown("<h1 style='text-align:center;'>Walmart Weekly Sales Prediction</h1>", unsafe_allow_html=True)
-st.write(datetime.datetime.now(tz=None))
-tabs = ["Data Analysis", "Visualization", "Train", "About"]
-page = st.sidebar.radio("Tabs", tabs)
 
-if page == "Data Analysis":
-    df = pd.read_csv(Path.train_path)
-    df = time_control_type(df, Path.timestamp_column)
-    control = time_len_control(df, Path.timestamp_column)
-    if control:
-        unique_list = auto_detect(df, Path.timestamp_column)
-        print(unique_list)
-        st.write("Unique List",unique_list)
-    df = date_sort(df,Path.timestamp_column,unique_list[0])
+
+@st.cache_resource(show_spinner=False)
+def get_stage_cache():
+    return StageCache(Path.stage_cache_max_bytes)
+
+
+def build_profile_report(df):
     variables = {
         "descriptions": {
             "Date": "The week of sales",
@@ -51,6 +50,26 @@ if page == "Data Analysis":
                        "due to the inappropriate machine learning algorithm. "
                        "An ideal ML algorithm will predict demand accurately and ingest factors like economic conditions including CPI, Unemployment Index, etc.",
         "url": "https://www.kaggle.com/datasets/yasserh/walmart-dataset"})
+    return profile
+
+
+st.set_page_config(page_title="End_To_End_Advanced_Multiple_Time_Series_Regression",
+                   page_icon="chart_with_upwards_trend", layout="wide")
+st.markdown("<h1 style='text-align:center;'>Walmart Weekly Sales Prediction</h1>", unsafe_allow_html=True)
+st.write(datetime.datetime.now(tz=None))
+tabs = ["Data Analysis", "Visualization", "Train", "About"]
+page = st.sidebar.radio("Tabs", tabs)
+stage_cache = get_stage_cache()
+data_hash = stage_cache.data_hash(Path.train_path)
+load_params = {'timestamp_column': Path.timestamp_column, 'datetime_format': Path.timestamp_format,
+               'sample_size': Path.schema_sample_size, 'columns': Path.dataset_columns, 'dtypes': Path.dataset_dtypes,
+               'memory_map': Path.dataset_memory_map, 'series_column': Path.series_column}
+
+if page == "Data Analysis":
+    df, unique_list = stage_cache.get_or_compute('load_panel', data_hash, load_params, load_panel, Path.train_path,
+                                                 **load_params)
+    st.write("Unique List",unique_list)
+    profile = stage_cache.get_or_compute('profile_report', data_hash, load_params, build_profile_report, df)
     st.title("Data Overview")
     st.write(df)
     st_profile_report(profile)
@@ -64,57 +83,129 @@ elif page == "Train":
     elif option == 'LGBMRegressor':
         model = LGBMRegressor(random_state=Path.random_state)
     elif option == 'CatBoostRegressor':
-        model = CatBoostRegressor(random_seed=Path.random_state)
-    df = pd.read_csv(Path.train_path)
-    df = time_control_type(df, Path.timestamp_column)
-    control = time_len_control(df, Path.timestamp_column)
-    if control:
-        unique_list = auto_detect(df, Path.timestamp_column)
-        print(unique_list)
+        model = CatBoostRegressor(random_seed=Path.random_state, allow_writing_files=False)
+    tracer = StageTracer(Path.stage_tracing, MemoryReport(Path.memory_report) if Path.memory_report else None)
+    feature_dtype = 'float32' if Path.memory_optimized else 'float64'
+    if Path.out_of_core:
+        unique_list = [Path.series_column]
+        pipeline = PartitionedPipeline(Path.train_path, Path.out_of_core_path, Path.series_column,
+                                       Path.timestamp_column, Path.target, Path.window, Path.window_list, Path.horizon,
+                                       Path.out_of_core_partition_size, Path.timestamp_format, Path.dataset_dtypes,
+                                       Path.date_cyclical, Path.matrix_dtype, Path.feature_n_jobs)
+        with tracer.stage('scan'):
+            pipeline.scan()
+            time_type = pipeline.time_type
+        with tracer.stage('stationarity_tests', memory=False) as row:
+            stationarity = tracer.add_frame(row, pipeline.stationarity())
+            isStationary_adf, isStationary_kpss = stationarity_vote(stationarity)
+        with tracer.stage('partitioned_features', memory=False):
+            pipeline.build(isStationary_adf, isStationary_kpss)
+        with tracer.stage('assemble') as row:
+            X, y = tracer.add_frame(row, pipeline.assemble())
+        num_cols, cat_cols, n_series = X.columns.tolist(), [], len(pipeline.series)
+    else:
+        with tracer.stage('load_panel') as row:
+            df, unique_list = stage_cache.get_or_compute('load_panel', data_hash, load_params, load_panel,
+                                                         Path.train_path, **load_params)
+            tracer.add_frame(row, df)
         st.write("Unique List", unique_list)
-    df = date_sort(df, Path.timestamp_column, unique_list[0])
-    df = date_engineering(df, Path.timestamp_column)
-    time_type, frequency = frequency_detect(df, Path.timestamp_column)
-    isStationary_adf = ADF_Test(df, Path.target, Path.timestamp_column)
-    isStationary_kpss = KPSS_Test(df, Path.target, Path.timestamp_column, trend=315)
-    df = editing_index(df, Path.timestamp_column, unique_list[0])
-    num_cols = df.select_dtypes(include=['float', 'int']).columns.tolist()
-    cat_cols = df.select_dtypes(exclude=['float', 'int']).columns.tolist()
-    lagged_data = app_lag_data(df, Path.window, num_cols, unique_list[0], Path.timestamp_column)
-    derived_data = app_derived_data(df, num_cols, Path.window, Path.window_list, time_type, frequency, unique_list[0],Path.timestamp_column)
-    derived_data = derived_data.reset_index()
-    derived_data.rename(columns={'level_0': Path.timestamp_column, 'level_1': unique_list[0]}, inplace=True)
-    derived_data = editing_index(derived_data, Path.timestamp_column, unique_list[0])
-    df = split_data(df,Path.window,len(df.reset_index()[unique_list[0]].unique()))
-    if not isStationary_kpss:
-        diff_data = app_diff_data(df, Path.window, lagged_data, derived_data, Path.target, time_type)
-    final_data = merge_data(df,lagged_data,derived_data)
-    if not isStationary_adf:
-        target_list = [x for x in final_data.columns.tolist() if x.startswith(Path.target) and x != Path.target]
-        final_data = trend_removal_log(final_data, target_list)
-    X, y = split(final_data, Path.target, Path.horizon, len(df.reset_index()[unique_list[0]].unique()))
-    num_cols = X.select_dtypes(include=['float', 'int']).columns.tolist()
-    X_train, X_test, y_train, y_test = make_train_test_splits(X, y, 0.20,
-                                                              len(df.reset_index()[unique_list[0]].unique()))
-    fold_list = get_fold(X_train,Path.fold_number,len(df.reset_index()[unique_list[0]].unique()))
+        with tracer.stage('date_engineering') as row:
+            df = tracer.add_frame(row, date_engineering(df.copy(), Path.timestamp_column, Path.date_encoding,
+                                                        Path.date_cyclical))
+            if Path.memory_optimized:
+                df = downcast_frame(df, exclude=[Path.target])
+        with tracer.stage('frequency_detect'):
+            time_type, frequency = frequency_detect(df, Path.timestamp_column)
+        with tracer.stage('stationarity_tests', memory=False) as row:
+            stationarity_params = {'target': Path.target, 'series_id': unique_list[0], 'load': load_params}
+            stationarity = tracer.add_frame(row, stage_cache.get_or_compute('stationarity', data_hash,
+                                                                            stationarity_params, stationarity_table,
+                                                                            df, Path.target, unique_list[0],
+                                                                            Path.timestamp_column,
+                                                                            n_jobs=Path.feature_n_jobs))
+            isStationary_adf, isStationary_kpss = stationarity_vote(stationarity)
+        df = editing_index(df, Path.timestamp_column, unique_list[0])
+        date_cols = date_feature_names(Path.date_cyclical)
+        num_cols = [x for x in df.select_dtypes(include=['number']).columns.tolist() if x not in date_cols]
+        cat_cols = df.select_dtypes(exclude=['number']).columns.tolist()
+        store = FeatureStore(Path.feature_store_path, Path.feature_store_max_bytes)
+        input_hash = data_hash
+        store_params = {'window': Path.window, 'window_list': Path.window_list, 'horizon': Path.horizon,
+                        'date_encoding': Path.date_encoding, 'date_cyclical': Path.date_cyclical,
+                        'feature_dtype': feature_dtype, 'num_cols': num_cols, 'series_id': unique_list[0],
+                        'load': load_params}
+        with tracer.stage('lagged_data') as row:
+            lagged_data = tracer.add_frame(row, store.load_or_compute('lagged_data', input_hash, store_params,
+                                                                      app_lag_data, df, Path.window, num_cols,
+                                                                      unique_list[0], Path.timestamp_column,
+                                                                      n_jobs=Path.feature_n_jobs, dtype=feature_dtype))
+        with tracer.stage('derived_data') as row:
+            derived_data = tracer.add_frame(row, store.load_or_compute('derived_data', input_hash, store_params,
+                                                                       app_derived_data, df, num_cols, Path.window,
+                                                                       Path.window_list, time_type, frequency,
+                                                                       unique_list[0], Path.timestamp_column,
+                                                                       n_jobs=Path.feature_n_jobs, dtype=feature_dtype))
+        n_series = len(df.reset_index()[unique_list[0]].unique())
+        df = split_data(df, Path.window, n_series)
+        diff_data = None
+        if not isStationary_kpss:
+            with tracer.stage('diff_data') as row:
+                diff_data = tracer.add_frame(row, store.load_or_compute('diff_data', input_hash, store_params,
+                                                                        app_diff_data, df, Path.window, lagged_data,
+                                                                        derived_data, Path.target, time_type,
+                                                                        dtype=feature_dtype))
+        with tracer.stage('assemble_matrix') as row:
+            X, y = tracer.add_frame(row, assemble_matrix(df, [lagged_data, derived_data, diff_data], Path.target,
+                                                         isStationary_adf, Path.horizon, n_series, Path.matrix_dtype))
+            num_cols = X.select_dtypes(include=['number']).columns.tolist()
+    with st.expander("Stationarity Tests"):
+        st.dataframe(stationarity)
+    with tracer.stage('split_folds'):
+        X_train, X_test, y_train, y_test = make_train_test_splits(X, y, 0.20, n_series)
+        fold_list = get_fold(X_train, Path.fold_number, n_series,
+                             Path.early_stopping_fraction if Path.early_stopping_rounds else 0.0)
     forecast_distance = time_type_detect(time_type)
-    best_params, best_value = optuna_optimize(X, y, fold_list, model, num_cols, cat_cols)
+    with tracer.stage('fold_cache', memory=False):
+        fold_cache = FoldMatrixCache(X, y, fold_list, num_cols, cat_cols, 1 if Path.out_of_core else None).fit_all()
+    tuning_params = {'load': load_params, 'window': Path.window, 'window_list': Path.window_list,
+                     'horizon': Path.horizon, 'date_encoding': Path.date_encoding, 'date_cyclical': Path.date_cyclical,
+                     'feature_dtype': feature_dtype, 'matrix_dtype': Path.matrix_dtype, 'out_of_core': Path.out_of_core,
+                     'fold_number': Path.fold_number, 'early_stopping_rounds': Path.early_stopping_rounds,
+                     'early_stopping_fraction': Path.early_stopping_fraction,
+                     'multi_output_strategy': Path.multi_output_strategy[option]}
+    with tracer.stage('optuna_optimize', memory=False):
+        best_params, best_value = optuna_optimize(X, y, fold_list, model, num_cols, cat_cols,
+                                                   n_jobs=Path.optuna_n_jobs, storage_path=Path.optuna_storage_path,
+                                                   early_stopping_rounds=Path.early_stopping_rounds,
+                                                   multi_output_strategy=Path.multi_output_strategy[option],
+                                                   fold_cache=fold_cache, thread_budget=Path.thread_budget,
+                                                   study_name=build_study_name(model, data_hash, tuning_params))
     model.set_params(**best_params)
+    feature_metadata = {'isStationary_adf': isStationary_adf, 'isStationary_kpss': isStationary_kpss,
+                        'date_encoding': 'ordinal' if Path.out_of_core else Path.date_encoding,
+                        'feature_columns': X.columns.tolist()}
     trainer = Trainer(X, y, fold_list, Path.horizon, num_cols, cat_cols, model, Path.timestamp_column, unique_list[0],
-                      Path.target, Path.models_path)
+                      Path.target, Path.models_path, Path.multi_output_strategy[option], fold_cache,
+                      ModelRegistry(Path.registry_path), Path.trainer_n_jobs, Path.trainer_horizon_jobs,
+                      Path.thread_budget, Path.early_stopping_rounds, feature_metadata)
     with st.spinner("Training is in progress, please wait..."):
-        trainer.train_and_visualization()
+        with tracer.stage('trainer', memory=False):
+            trainer.train_and_visualization()
+    if Path.stage_tracing:
+        trace_file = tracer.save(Path.trace_path, {'model': option, 'data_hash': data_hash})
+        trace = tracer.to_frame()
+        with st.expander("Stage Breakdown", expanded=True):
+            st.write(f"Trace saved to {trace_file}")
+            st.bar_chart(trace.set_index('stage')[['wall_s', 'cpu_s']])
+            st.dataframe(trace)
+    if Path.memory_report:
+        st.write("Memory Report", tracer.memory.to_frame())
 
 elif page == "Visualization":
-    df = pd.read_csv(Path.train_path)
     with st.spinner("Visuals are being generated, please wait..."):
-        df = time_control_type(df, Path.timestamp_column)
-        control = time_len_control(df, Path.timestamp_column)
-        if control:
-            unique_list = auto_detect(df, Path.timestamp_column)
-            print(unique_list)
-            st.write("Unique List", unique_list)
-        df = date_sort(df, Path.timestamp_column, unique_list[0])
+        df, unique_list = stage_cache.get_or_compute('load_panel', data_hash, load_params, load_panel, Path.train_path,
+                                                     **load_params)
+        st.write("Unique List", unique_list)
         for i in df[unique_list[0]].unique():
             st.write("Store : ",i)
             data = df[df[unique_list[0]] == i]
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import argparse
+import platform
+import warnings
+from lightgbm import LGBMRegressor
+from paths import Path
+from src.data.preprocess_data import *
+from src.data.memory_report import MemoryReport
+from src.data.synthetic_data import synthetic_panel
+from src.features.feature_engineering import date_engineering, date_feature_names
+from src.models.metrics import metrics_calculate
+
+warnings.filterwarnings("ignore")
+
+NOISE_FLOOR = {'seconds': 0.005, 'peak_mb': 1.0}
+
+
+def measure(results, name, func, *args, repeats=3, **kwargs):
+    """
+    Run a stage once under tracemalloc for its peak memory, then time it over repeats.
+
+    Parameters:
+    - results (dict): The stage results the measurement is added to.
+    - name (str): The stage name.
+    - func (callable): The stage function.
+    - repeats (int, optional): Number of timed runs; the best time is kept. Defaults to 3.
+
+    Returns:
+    - The result of the stage.
+    """
+    memory = MemoryReport()
+    with memory.stage(name):
+        value = func(*args, **kwargs)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    results[name] = {'seconds': min(timings), 'peak_mb': memory.rows[0]['peak_mb']}
+    print(f"{name:<20} {results[name]['seconds']:>10.4f} s {results[name]['peak_mb']:>10.1f} MB")
+    return value
+
+
+def run_benchmarks(n_stores, n_weeks, repeats=3):
+    """
+    Run every benchmarked stage on a synthetic panel, in the order app.py drives them.
+
+    Parameters:
+    - n_stores (int): Number of stores of the synthetic panel.
+    - n_weeks (int): Number of weeks per store.
+    - repeats (int, optional): Number of timed runs per stage. Defaults to 3.
+
+    Returns:
+    - dict: Time (s) and peak traced memory (MB) of every stage.
+    """
+    results = {}
+    df = synthetic_panel(n_stores, n_weeks)
+    df = measure(results, 'time_control_type', lambda: time_control_type(df.copy(), Path.timestamp_column,
+                                                                          Path.timestamp_format), repeats=repeats)
+    unique_list = measure(results, 'auto_detect', auto_detect, df, Path.timestamp_column, Path.schema_sample_size,
+                          repeats=repeats)
+    df = date_sort(df, Path.timestamp_column, unique_list[0])
+    time_type, frequency = measure(results, 'frequency_detect', frequency_detect, df, Path.timestamp_column,
+                                   repeats=repeats)
+    df = date_engineering(df, Path.timestamp_column, Path.date_encoding, Path.date_cyclical)
+    df = editing_index(df, Path.timestamp_column, unique_list[0])
+    date_cols = date_feature_names(Path.date_cyclical)
+    num_cols = [x for x in df.select_dtypes(include=['number']).columns.tolist() if x not in date_cols]
+    cat_cols = df.select_dtypes(exclude=['number']).columns.tolist()
+    lagged_data = measure(results, 'app_lag_data', app_lag_data, df, Path.window, num_cols, unique_list[0],
+                          Path.timestamp_column, repeats=repeats)
+    derived_data = measure(results, 'app_derived_data', app_derived_data, df, num_cols, Path.window, Path.window_list,
+                           time_type, frequency, unique_list[0], Path.timestamp_column, repeats=repeats)
+    df = split_data(df, Path.window, n_stores)
+    diff_data = measure(results, 'app_diff_data', app_diff_data, df, Path.window, lagged_data, derived_data, Path.target,
+                        time_type, repeats=repeats)
+    final_data = measure(results, 'merge_data', merge_data, df, lagged_data, derived_data, diff_data, repeats=repeats)
+    measure(results, 'split', split, final_data, Path.target, Path.horizon, n_stores, repeats=repeats)
+    X, y = measure(results, 'assemble_matrix', assemble_matrix, df, [lagged_data, derived_data, diff_data], Path.target,
+                   True, Path.horizon, n_stores, Path.matrix_dtype, repeats=repeats)
+    num_cols = X.select_dtypes(include=['number']).columns.tolist()
+    X_train, X_test, y_train, y_test = make_train_test_splits(X, y, 0.20, n_stores)
+    fold_list = measure(results, 'get_fold', get_fold, X_train, Path.fold_number, n_stores, repeats=repeats)
+    train, val = fold_indexer(fold_list[-1]['train']), fold_indexer(fold_list[-1]['validation'])
+    alg = LGBMRegressor(n_estimators=100, random_state=Path.random_state, verbosity=-1)
+    pipe = measure(results, 'pipeline_fit', lambda: fit_pipeline(pipeline_build(alg, num_cols, cat_cols),
+                                                                  X.iloc[train], y.iloc[train]), repeats=repeats)
+    y_pred = pipe.predict(X.iloc[val])
+    measure(results, 'metrics_calculate', metrics_calculate, y.iloc[val], y_pred, X.iloc[train], repeats=repeats)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Flag the stages that got slower or use more memory than their baseline. Differences below NOISE_FLOOR are ignored so
+    that stages running in microseconds do not flag timer noise.
+
+    Parameters:
+    - results (dict): The current stage results.
+    - baseline (dict): The baseline stage results.
+    - tolerance (float): The relative increase allowed before a stage is flagged (0.2 allows 20%).
+
+    Returns:
+    - list: One message per regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            before, after = baseline[name][metric], current[metric]
+            if before and after > before * (1 + tolerance) and after - before > NOISE_FLOOR[metric]:
+                regressions.append(f'{name} {metric}: {before:.4f} -> {after:.4f} (+{(after / before - 1) * 100:.0f}%)')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the preprocessing and training stages on synthetic panels.')
+    parser.add_argument('--stores', type=int, default=45, help='Number of stores of the synthetic panel.')
+    parser.add_argument('--weeks', type=int, default=143, help='Number of weeks per store.')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of timed runs per stage.')
+    parser.add_argument('--baseline', default=Path.benchmark_baseline_path, help='JSON baseline file.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the baseline of this size.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown before flagging.')
+    args = parser.parse_args()
+    size = f'{args.stores}x{args.weeks}'
+    print(f"Synthetic panel : {size} ({args.stores * args.weeks} rows)")
+    results = run_benchmarks(args.stores, args.weeks, args.repeats)
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baselines = json.load(handle)
+    if args.save_baseline:
+        baselines[size] = {'machine': platform.platform(), 'python': platform.python_version(), 'created': time.time(),
+                           'stages': results}
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as handle:
+            json.dump(baselines, handle, indent=2)
+        print(f"Baseline saved : {args.baseline} [{size}]")
+    elif size in baselines:
+        regressions = compare(results, baselines[size]['stages'], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regression against the {size} baseline (tolerance {args.tolerance:.0%})")
+    else:
+        print(f"No {size} baseline in {args.baseline}; run with --save-baseline to create one.")
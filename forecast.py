@@ -0,0 +1,92 @@
+import argparse
+import warnings
+from paths import Path
+from src.data.preprocess_data import frequency_detect, stationarity_table, stationarity_vote, editing_index, \
+    downcast_frame
+from src.data.dataset_source import load_panel
+from src.features.feature_engineering import date_engineering, date_feature_names
+from src.models.forecaster import load_pipelines, load_feature_metadata, latest_features, BatchForecaster
+from src.models.model_registry import ModelRegistry
+
+warnings.filterwarnings("ignore")
+
+
+def latest_panel_features(file=Path.train_path, feature_metadata=None):
+    """
+    Build the feature row of the last timestamp of every series of a panel file, the way the Train tab builds features.
+
+    Parameters:
+    - file (str, optional): The panel file to forecast from. Defaults to Path.train_path.
+    - feature_metadata (dict, optional): The feature settings the model was trained with (see load_feature_metadata).
+      Its ADF/KPSS decisions and date encoding are reused and the rows get its feature columns, in training order.
+      Defaults to None, which reruns the stationarity tests on the panel.
+
+    Returns:
+    - pd.DataFrame: One feature row per series, indexed by (timestamp, series_id).
+    """
+    feature_metadata = feature_metadata or {}
+    df, unique_list = load_panel(file, Path.timestamp_column, Path.timestamp_format, Path.schema_sample_size,
+                                 Path.dataset_columns, Path.dataset_dtypes, Path.dataset_memory_map, Path.series_column)
+    df = date_engineering(df, Path.timestamp_column, feature_metadata.get('date_encoding', Path.date_encoding),
+                          Path.date_cyclical)
+    feature_dtype = 'float32' if Path.memory_optimized else 'float64'
+    if Path.memory_optimized:
+        df = downcast_frame(df, exclude=[Path.target])
+    time_type, frequency = frequency_detect(df, Path.timestamp_column)
+    if 'isStationary_adf' in feature_metadata:
+        isStationary_adf, isStationary_kpss = feature_metadata['isStationary_adf'], feature_metadata['isStationary_kpss']
+    else:
+        stationarity = stationarity_table(df, Path.target, unique_list[0], Path.timestamp_column,
+                                          n_jobs=Path.feature_n_jobs)
+        isStationary_adf, isStationary_kpss = stationarity_vote(stationarity)
+    df = editing_index(df, Path.timestamp_column, unique_list[0])
+    date_cols = date_feature_names(Path.date_cyclical)
+    num_cols = [x for x in df.select_dtypes(include=['number']).columns.tolist() if x not in date_cols]
+    X = latest_features(df, Path.window, Path.window_list, num_cols, time_type, frequency, unique_list[0],
+                        Path.timestamp_column, Path.target, isStationary_adf, feature_dtype, isStationary_kpss)
+    feature_columns = feature_metadata.get('feature_columns')
+    if feature_columns is not None:
+        missing = [x for x in feature_columns if x not in X.columns]
+        if missing:
+            raise ValueError(f'The forecast features lack columns the model was trained on: {missing}')
+        X = X[feature_columns]
+    return X
+
+
+def batch_forecast(model_name, file=Path.train_path, folds=None, benchmark=False):
+    """
+    Forecast +1..+H for every series of a panel file with the fitted pipelines of a model.
+
+    Parameters:
+    - model_name (str): Name of the trained model (e.g. 'XGBRegressor').
+    - file (str, optional): The panel file to forecast from. Defaults to Path.train_path.
+    - folds (list, optional): Fold pipelines to average. Defaults to None, which uses every saved fold.
+    - benchmark (bool, optional): If True, the prediction throughput is measured as well. Defaults to False.
+
+    Returns:
+    - tuple: The forecasts (one row per series) and the throughput dict (None unless benchmark is True).
+    """
+    registry = ModelRegistry(Path.registry_path)
+    X = latest_panel_features(file, load_feature_metadata(Path.models_path, model_name, registry))
+    pipelines = load_pipelines(Path.models_path, model_name, folds, registry, Path.registry_mmap)
+    forecaster = BatchForecaster(pipelines, Path.horizon)
+    forecasts = forecaster.predict(X)
+    throughput = forecaster.throughput(X) if benchmark else None
+    return forecasts, throughput
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Forecast every series with the saved fold pipelines of a model.')
+    parser.add_argument('model', choices=['XGBRegressor', 'LGBMRegressor', 'CatBoostRegressor'])
+    parser.add_argument('--file', default=Path.train_path, help='Panel file to forecast from.')
+    parser.add_argument('--folds', type=int, nargs='*', default=None, help='Fold pipelines to average (default: all).')
+    parser.add_argument('--output', default=None, help='CSV file the forecasts are written to.')
+    parser.add_argument('--benchmark', action='store_true', help='Report the prediction throughput in rows/sec.')
+    args = parser.parse_args()
+    forecasts, throughput = batch_forecast(args.model, args.file, args.folds, args.benchmark)
+    print(forecasts)
+    if throughput:
+        print(f"Throughput : {throughput['rows_per_sec']:.1f} rows/sec "
+              f"({throughput['rows']} rows in {throughput['seconds'] * 1000:.2f} ms)")
+    if args.output:
+        forecasts.to_csv(args.output)
@@ -5,26 +5,104 @@ class Path:
     Attributes:
         target (str): The target variable for the time series project.
         timestamp_column (str): The column representing timestamps in the data.
+        series_column (str): The series identifier column, used by the out-of-core pipeline which cannot auto-detect it
+            and when auto-detection finds no identifier.
+        timestamp_format (str): The strftime format of the timestamp column (None infers it from a sample).
+        dataset_columns (list): The columns read from the data file (None reads every column).
+        dataset_dtypes (dict): Explicit dtypes of the data file columns, which skips their type inference.
+        dataset_memory_map (bool): Whether the data file is memory-mapped when read.
+        schema_sample_size (int): The number of sampled rows used to reject series identifier candidates on large inputs.
         root (str): The root directory for the project.
         train_path (str): The file path to the raw Walmart sales data.
         cleaned_train_path (str): The file path to the preprocessed and cleaned training data.
         models_path (str): The directory path to store trained models.
+        registry_path (str): The directory of the model registry storing fitted folds in native booster formats.
+        registry_mmap (bool): Whether the preprocessing state of registered models is memory-mapped when loaded.
+        feature_store_path (str): The directory path of the on-disk feature store.
+        benchmark_baseline_path (str): The JSON file the benchmark suite stores its per-stage baselines in.
+        feature_store_max_bytes (int): The size limit of the feature store before the least recently used entries are evicted.
+        stage_cache_max_bytes (int): The memory bound of the in-process cache shared by the Streamlit tabs.
         fold_number (int): The number of folds for time series cross-validation.
         hyperparameter_trial_number (int): The number of trials for hyperparameter tuning.
+        optuna_n_jobs (int): The number of worker processes running tuning trials concurrently (-1 uses every core).
+        optuna_storage_path (str): The local Optuna storage (SQLite .db or journal file) the tuning workers share.
+        pruner_startup_trials (int): The number of completed trials before the median pruner starts stopping trials.
+        trainer_n_jobs (int): The number of folds the Trainer fits concurrently (-1 fits every fold at once).
+        trainer_horizon_jobs (int): The number of horizon models each fold fits concurrently ('separate' strategy).
+        thread_budget (int): The total number of threads shared by all concurrently fitted boosters (None uses every core).
+        early_stopping_rounds (int): The number of boosting rounds without validation improvement before a fold fit stops.
+        early_stopping_fraction (float): The share of each fold's train slice held out as its early-stopping set, so the
+            validation slice is only used for scoring.
+        multi_output_strategy (dict): Per model, how the horizon steps are learned: 'separate' (one model per step),
+            'native' (one multi-target booster, CatBoost/XGBoost only; XGBoost still grows one tree per step) or 'stacked'
+            (one model with the step as a feature).
         window (int): The size of the rolling window used in feature engineering.
         window_list (list of int): A list of window sizes for feature engineering.
         horizon (int): The forecast horizon for time series predictions.
+        date_encoding (str): How date parts are encoded: 'onehot' (strings, one-hot encoded) or 'ordinal' (small integers,
+            deliberately treated as ordered numerics, not categories).
+        date_cyclical (bool): Whether sine/cosine encodings of the periodic date parts are added.
+        feature_n_jobs (int): The number of worker processes used to build lag and derived features (-1 uses every core).
+        serve_host (str): The interface the local forecast server binds to.
+        serve_port (int): The port of the local forecast server.
+        serve_max_batch_size (int): The maximum number of requests the forecast server predicts in one call.
+        serve_max_wait_ms (float): How long the forecast server waits for more requests before predicting a batch.
+        matrix_dtype (str): The dtype of the contiguous feature matrix the models are trained on.
+        memory_optimized (bool): Whether numeric columns are downcast and lag/derived features are built as float32.
+        out_of_core (bool): Whether the Train tab builds features partition by partition and trains on a memory-mapped matrix.
+        out_of_core_path (str): The directory of the partitioned feature dataset and the memory-mapped matrix.
+        out_of_core_partition_size (int): The number of series per partition of the out-of-core pipeline.
+        memory_report (bool): Whether the per-stage memory usage of the feature pipeline is reported in the Train tab.
+        stage_tracing (bool): Whether the wall time, CPU time, peak RSS and shape of every Train-tab stage are traced.
+        trace_path (str): The directory the stage traces are written to as JSON files.
         random_state (int): The random seed for reproducibility.
     """
     target = 'Weekly_Sales'
     timestamp_column = 'Date'
+    series_column = 'Store'
+    timestamp_format = '%d-%m-%Y'
+    dataset_columns = None
+    dataset_dtypes = {'Store': 'int64', 'Weekly_Sales': 'float64', 'Holiday_Flag': 'int64', 'Temperature': 'float64',
+                      'Fuel_Price': 'float64', 'CPI': 'float64', 'Unemployment': 'float64'}
+    dataset_memory_map = False
+    schema_sample_size = 1000000
     root = 'C:/Users/MahmutYAVUZ/Desktop/Software/Python/kaggle/advanced_multiple_time_series/'
     train_path = root + '/data/raw/Walmart.csv'
     cleaned_train_path = root + '/data/preprocessed/cleaned_train.csv'
     models_path = root + "/models/"
+    registry_path = models_path + "registry/"
+    registry_mmap = False
+    feature_store_path = root + "/data/feature_store/"
+    benchmark_baseline_path = root + "/benchmarks/baseline.json"
+    feature_store_max_bytes = 2 * 1024 ** 3
+    stage_cache_max_bytes = 1024 ** 3
     fold_number = 3
     hyperparameter_trial_number = 3
+    optuna_n_jobs = 1
+    optuna_storage_path = models_path + "optuna_journal.log"
+    pruner_startup_trials = 1
+    trainer_n_jobs = 1
+    trainer_horizon_jobs = 1
+    thread_budget = None
+    early_stopping_rounds = 50
+    early_stopping_fraction = 0.1
+    multi_output_strategy = {'XGBRegressor': 'separate', 'LGBMRegressor': 'separate', 'CatBoostRegressor': 'separate'}
     window = 50
     window_list = [50,25,10]
     horizon = 4
+    date_encoding = 'onehot'
+    date_cyclical = False
+    feature_n_jobs = 1
+    serve_host = '127.0.0.1'
+    serve_port = 8502
+    serve_max_batch_size = 64
+    serve_max_wait_ms = 5
+    matrix_dtype = 'float32'
+    memory_optimized = False
+    memory_report = False
+    out_of_core = False
+    out_of_core_path = root + "/data/partitioned/"
+    out_of_core_partition_size = 10
+    stage_tracing = True
+    trace_path = models_path + "traces/"
     random_state = 42
@@ -0,0 +1,193 @@
+import json
+import time
+import argparse
+import warnings
+import urllib.request
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from paths import Path
+from forecast import latest_panel_features
+from src.models.forecaster import load_pipelines, load_feature_metadata, BatchForecaster
+from src.models.micro_batcher import MicroBatcher
+from src.models.model_registry import ModelRegistry
+
+warnings.filterwarnings("ignore")
+
+MODELS = ['XGBRegressor', 'LGBMRegressor', 'CatBoostRegressor']
+
+
+class ForecastServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def build_model_pool(models=MODELS):
+    """
+    Load the saved fold pipelines of every trained model and start one micro-batcher per model.
+
+    Parameters:
+    - models (list, optional): Model names to preload. Models without saved pipelines are skipped. Defaults to MODELS.
+
+    Returns:
+    - dict: The MicroBatcher of every loaded model, keyed by model name.
+    """
+    pool = {}
+    registry = ModelRegistry(Path.registry_path)
+    for model_name in models:
+        try:
+            pipelines = load_pipelines(Path.models_path, model_name, registry=registry, mmap=Path.registry_mmap)
+        except (FileNotFoundError, OSError) as error:
+            print(f"Skipping {model_name} : {error}")
+            continue
+        pool[model_name] = MicroBatcher(BatchForecaster(pipelines, Path.horizon), Path.serve_max_batch_size,
+                                        Path.serve_max_wait_ms)
+        print(f"Loaded {model_name} : {len(pipelines)} fold pipelines")
+    return pool
+
+
+def build_handler(pool, features, series_id):
+    """
+    Build the request handler class serving the model pool.
+
+    Endpoints:
+    - GET /forecast?model=<Model>&store=<id>[&store=<id>...]: +1..+H forecasts of the given stores (all when omitted).
+    - GET /stats: latency and throughput counters of every model.
+    - GET /health: the loaded models and the served store ids.
+
+    Parameters:
+    - pool (dict): The MicroBatcher of every model (see build_model_pool).
+    - features (dict): The latest feature row of every series, as a DataFrame per model.
+    - series_id (str): The name of the index level representing the series identifier.
+
+    Returns:
+    - type: The BaseHTTPRequestHandler subclass.
+    """
+    series = next(iter(features.values())).index.get_level_values(series_id) if features else []
+    positions = {str(store): i for i, store in enumerate(series)}
+
+    class ForecastHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == '/health':
+                return self._send(200, {'models': list(pool), 'stores': list(positions)})
+            if url.path == '/stats':
+                return self._send(200, {name: batcher.stats.snapshot() for name, batcher in pool.items()})
+            if url.path != '/forecast':
+                return self._send(404, {'error': f'Unknown endpoint {url.path}'})
+            model_name = query.get('model', [next(iter(pool), None)])[0]
+            if model_name not in pool:
+                return self._send(404, {'error': f'Model {model_name} is not loaded'})
+            stores = query.get('store', list(positions))
+            missing = [x for x in stores if x not in positions]
+            if missing:
+                return self._send(404, {'error': f'Unknown {series_id} {missing}'})
+            X = features[model_name].iloc[[positions[x] for x in stores]]
+            try:
+                y_pred = pool[model_name].submit(X).result()
+            except Exception as error:
+                return self._send(500, {'error': str(error)})
+            forecasts = json.loads(y_pred.reset_index().to_json(orient='records', date_format='iso'))
+            return self._send(200, {'model': model_name, 'forecasts': forecasts})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ForecastHandler
+
+
+def serve(host=Path.serve_host, port=Path.serve_port, file=Path.train_path):
+    """
+    Preload the model pool and the latest features of every series, built with the feature settings each model was
+    trained with, then serve forecasts until interrupted.
+
+    Parameters:
+    - host (str, optional): Interface to bind; keep it on the loopback interface. Defaults to Path.serve_host.
+    - port (int, optional): Port to bind. Defaults to Path.serve_port.
+    - file (str, optional): The panel file the latest features are built from. Defaults to Path.train_path.
+
+    Returns:
+    - None
+    """
+    pool = build_model_pool()
+    registry = ModelRegistry(Path.registry_path)
+    features, built = {}, {}
+    for model_name in pool:
+        feature_metadata = load_feature_metadata(Path.models_path, model_name, registry)
+        key = json.dumps(feature_metadata, sort_keys=True)
+        if key not in built:
+            built[key] = latest_panel_features(file, feature_metadata)
+        features[model_name] = built[key]
+    series_id = next(iter(features.values())).index.names[1] if features else Path.series_column
+    server = ForecastServer((host, port), build_handler(pool, features, series_id))
+    print(f"Serving {list(pool)} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def load_test(model_name, stores, n_requests=1000, concurrency=16, host=Path.serve_host, port=Path.serve_port):
+    """
+    Send concurrent single-store forecast requests to a running server and measure their latency.
+
+    Parameters:
+    - model_name (str): The model to query.
+    - stores (list): Store ids the requests cycle through.
+    - n_requests (int, optional): Number of requests. Defaults to 1000.
+    - concurrency (int, optional): Number of concurrent clients. Defaults to 16.
+    - host (str, optional): Server host. Defaults to Path.serve_host.
+    - port (int, optional): Server port. Defaults to Path.serve_port.
+
+    Returns:
+    - dict: Client-side p50/p99 latency in milliseconds, throughput and the server counters.
+    """
+    def request(i):
+        start = time.perf_counter()
+        url = f'http://{host}:{port}/forecast?model={model_name}&store={stores[i % len(stores)]}'
+        with urllib.request.urlopen(url) as response:
+            response.read()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = np.array(list(executor.map(request, range(n_requests)))) * 1000
+    elapsed = time.perf_counter() - start
+    with urllib.request.urlopen(f'http://{host}:{port}/stats') as response:
+        server_stats = json.loads(response.read())
+    return {'requests': n_requests, 'concurrency': concurrency, 'requests_per_sec': n_requests / elapsed,
+            'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+            'server': server_stats.get(model_name)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local forecast server with micro-batched predictions.')
+    parser.add_argument('--host', default=Path.serve_host)
+    parser.add_argument('--port', type=int, default=Path.serve_port)
+    parser.add_argument('--file', default=Path.train_path, help='Panel file the latest features are built from.')
+    parser.add_argument('--load-test', action='store_true', help='Load-test a running server instead of serving.')
+    parser.add_argument('--model', default='XGBRegressor', help='Model queried by the load test.')
+    parser.add_argument('--stores', nargs='*', default=None, help='Store ids queried by the load test (default: all).')
+    parser.add_argument('--requests', type=int, default=1000, help='Number of load-test requests.')
+    parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent load-test clients.')
+    args = parser.parse_args()
+    if args.load_test:
+        stores = args.stores
+        if not stores:
+            with urllib.request.urlopen(f'http://{args.host}:{args.port}/health') as response:
+                stores = json.loads(response.read())['stores']
+        print(load_test(args.model, stores, args.requests, args.concurrency, args.host, args.port))
+    else:
+        serve(args.host, args.port, args.file)
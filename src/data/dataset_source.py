@@ -1,22 +1,131 @@
+import os
 import pandas as pd
+from src.data.preprocess_data import time_control_type, time_len_control, auto_detect, date_sort
 
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather'
+}
 
-def read_dataset(file):
+
+def read_dataset(file, columns=None, dtypes=None, memory_map=False):
     """
        Read a dataset based on the specified file format.
 
+       Parquet, Feather and Arrow IPC files are read with pyarrow, which only decodes the requested columns.
+
        Parameters
        ----------
        file : str
-           The name of the file to be read (e.g., "data.csv" or "data.xlsx").
+           The name of the file to be read (e.g., "data.csv", "data.xlsx", "data.parquet" or "data.feather").
+       columns : list, optional
+           The columns to be read; every column when None.
+       dtypes : dict, optional
+           Explicit dtypes of some columns, which skips their type inference for text formats.
+       memory_map : bool, optional
+           Whether the file is memory-mapped instead of read into a buffer first.
 
        Returns
        -------
        df : pandas.DataFrame
            The read dataset.
    """
-    if file.split('.')[1] == 'csv':
-        data = pd.read_csv(file)
-    elif file.split('.')[1] == 'xlsx':
-        data = pd.read_excel(file)
+    extension = os.path.splitext(file)[1].lower()
+    dtypes = {k: v for k, v in (dtypes or {}).items() if columns is None or k in columns}
+    if extension in COLUMNAR_FORMATS:
+        if COLUMNAR_FORMATS[extension] == 'parquet':
+            import pyarrow.parquet as pq
+            table = pq.read_table(file, columns=columns, memory_map=memory_map)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(file, columns=columns, memory_map=memory_map)
+        data = table.to_pandas(split_blocks=True, self_destruct=True)
+        data = data.astype({k: v for k, v in dtypes.items() if k in data.columns})
+    elif extension == '.csv':
+        data = pd.read_csv(file, usecols=columns, dtype=dtypes, memory_map=memory_map)
+    elif extension in ('.xlsx', '.xls'):
+        data = pd.read_excel(file, usecols=columns, dtype=dtypes)
+    else:
+        raise ValueError(f'Unsupported file format {extension!r}: expected .csv, .xlsx, .parquet, .feather or .arrow')
     return data
+
+
+def write_dataset(data, file):
+    """
+       Write a dataset in the format given by the file extension, e.g. to convert a CSV extract to Parquet once.
+
+       Parameters
+       ----------
+       data : pandas.DataFrame
+           The dataset to be written.
+       file : str
+           The path of the file (".csv", ".parquet" or ".feather"/".arrow").
+
+       Returns
+       -------
+       file : str
+           The written file.
+   """
+    extension = os.path.splitext(file)[1].lower()
+    if COLUMNAR_FORMATS.get(extension) == 'parquet':
+        data.to_parquet(file, engine='pyarrow', index=False)
+    elif COLUMNAR_FORMATS.get(extension) == 'feather':
+        data.reset_index(drop=True).to_feather(file)
+    elif extension == '.csv':
+        data.to_csv(file, index=False)
+    else:
+        raise ValueError(f'Unsupported file format {extension!r}: expected .csv, .parquet, .feather or .arrow')
+    return file
+
+
+def load_panel(file, timestamp_column, datetime_format=None, sample_size=None, columns=None, dtypes=None,
+               memory_map=False, series_column=None):
+    """
+       Read the raw panel, convert its timestamp column, detect the series identifier and sort it by date and series.
+
+       Parameters
+       ----------
+       file : str
+           The path of the file to be read (any format supported by read_dataset).
+       timestamp_column : str
+           The name of the timestamp column.
+       datetime_format : str, optional
+           The strftime format of the timestamp column; inferred from a sample when None.
+       sample_size : int, optional
+           The number of sampled rows auto_detect uses to reject candidate columns early on large inputs.
+       columns : list, optional
+           The columns to be read (see read_dataset).
+       dtypes : dict, optional
+           Explicit column dtypes (see read_dataset).
+       memory_map : bool, optional
+           Whether the file is memory-mapped (see read_dataset).
+       series_column : str, optional
+           The series identifier used when auto_detect finds none, e.g. on an unbalanced panel.
+
+       Returns
+       -------
+       df : pandas.DataFrame
+           The sorted dataset.
+       unique_list : list
+           The detected series identifier columns.
+
+       Raises
+       ------
+       ValueError
+           If no series identifier is detected and series_column is not a column of the dataset.
+   """
+    df = read_dataset(file, columns, dtypes, memory_map)
+    df = time_control_type(df, timestamp_column, datetime_format)
+    unique_list = []
+    if time_len_control(df, timestamp_column):
+        unique_list = auto_detect(df, timestamp_column, sample_size)
+    if not unique_list:
+        if series_column not in df.columns:
+            raise ValueError(f'No series identifier column detected in {file!r} and the fallback series column '
+                             f'{series_column!r} is not in the dataset')
+        unique_list = [series_column]
+    df = date_sort(df, timestamp_column, unique_list[0])
+    return df, unique_list
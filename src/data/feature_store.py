@@ -0,0 +1,175 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+
+STAGE_VERSIONS = {
+    'lagged_data': 2,
+    'derived_data': 2,
+    'diff_data': 1
+}
+
+
+def file_hash(file, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 digest of a file, reading it in chunks.
+
+    Parameters
+    ----------
+    file : str
+        The path of the file to hash.
+    chunk_size : int, optional
+        The number of bytes read per chunk.
+
+    Returns
+    -------
+    digest : str
+        The hexadecimal digest of the file content.
+    """
+    sha = hashlib.sha256()
+    with open(file, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class FeatureStore:
+    def __init__(self, root, max_bytes):
+        """
+        Initialize the FeatureStore class.
+
+        Each pipeline stage output is written as a Parquet file under <root>/<stage>/<key>.parquet, where the key is derived
+        from the input data hash, the stage parameters and the stage version in STAGE_VERSIONS.
+
+        Parameters:
+        - root (str): Directory of the feature store.
+        - max_bytes (int): Total size limit; the least recently used files are evicted beyond it.
+
+        Returns:
+        - None
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def key(self, stage, input_hash, params):
+        """
+        Build the content address of a stage output.
+
+        Parameters:
+        - stage (str): The stage name (e.g. 'lagged_data').
+        - input_hash (str): Hash of the input data file.
+        - params (dict): The parameters the stage output depends on (e.g. window, window_list, horizon).
+
+        Returns:
+        - str: The hexadecimal key of the stage output.
+        """
+        payload = json.dumps({'stage': stage, 'input': input_hash, 'params': params,
+                              'version': STAGE_VERSIONS.get(stage, 0)}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, stage, key):
+        """
+        Resolve the file path of a stage output.
+
+        Parameters:
+        - stage (str): The stage name.
+        - key (str): The key returned by key().
+
+        Returns:
+        - str: The Parquet file path.
+        """
+        return os.path.join(self.root, stage, f'{key}.parquet')
+
+    def get(self, stage, key):
+        """
+        Load a stored stage output.
+
+        Parameters:
+        - stage (str): The stage name.
+        - key (str): The key returned by key().
+
+        Returns:
+        - pd.DataFrame or None: The stored DataFrame, or None when it is not in the store.
+        """
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+        data = pd.read_parquet(path, engine='pyarrow')
+        os.utime(path)
+        return data
+
+    def put(self, stage, key, data):
+        """
+        Store a stage output and evict old entries if the store grows beyond max_bytes.
+
+        Parameters:
+        - stage (str): The stage name.
+        - key (str): The key returned by key().
+        - data (pd.DataFrame): The stage output.
+
+        Returns:
+        - None
+        """
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        data.to_parquet(tmp_path, engine='pyarrow')
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def load_or_compute(self, stage, input_hash, params, func, *args, **kwargs):
+        """
+        Return the stored output of a stage, computing and storing it on a miss.
+
+        Parameters:
+        - stage (str): The stage name.
+        - input_hash (str): Hash of the input data file.
+        - params (dict): The parameters the stage output depends on.
+        - func (callable): The function computing the stage output from *args and **kwargs.
+
+        Returns:
+        - pd.DataFrame: The stage output.
+        """
+        key = self.key(stage, input_hash, params)
+        data = self.get(stage, key)
+        if data is None:
+            data = func(*args, **kwargs)
+            self.put(stage, key, data)
+        return data
+
+    def invalidate(self, stage=None):
+        """
+        Remove every stored output of one stage, or of all stages when stage is None.
+
+        Parameters:
+        - stage (str, optional): The stage name. Defaults to None.
+
+        Returns:
+        - None
+        """
+        path = self.root if stage is None else os.path.join(self.root, stage)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+    def evict(self):
+        """
+        Delete the least recently used files until the store fits in max_bytes.
+
+        Returns:
+        - None
+        """
+        if not os.path.exists(self.root):
+            return
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.parquet'):
+                    stat = os.stat(os.path.join(directory, name))
+                    files.append((stat.st_mtime, stat.st_size, os.path.join(directory, name)))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,89 @@
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+
+def frame_memory_mb(data):
+    """
+    Return the deep memory usage of a DataFrame or Series in megabytes.
+
+    Parameters:
+    - data (pd.DataFrame or pd.Series): The frame to be measured.
+
+    Returns:
+    - float: The memory usage in MB.
+    """
+    return float(np.sum(data.memory_usage(deep=True))) / 1024 ** 2
+
+
+class MemoryReport:
+    def __init__(self, enabled=True):
+        """
+        Initialize the MemoryReport class.
+
+        Every stage run inside stage() is traced with tracemalloc; the memory retained by the stage, its peak allocation
+        and the size of the frame it produced are collected into one row per stage.
+
+        Parameters:
+        - enabled (bool): If False, stage() only runs the wrapped block and nothing is recorded.
+
+        Returns:
+        - None
+        """
+        self.enabled = enabled
+        self.rows = []
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Trace the memory allocated by the wrapped block.
+
+        Parameters:
+        - name (str): The stage name.
+
+        Yields:
+        - dict: The row of the stage; the frame it produced can be attached with add_frame().
+        """
+        row = {'stage': name}
+        if not self.enabled:
+            yield row
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.stop()
+        tracemalloc.start()
+        try:
+            yield row
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if tracing:
+                tracemalloc.start()
+            row.update({'retained_mb': current / 1024 ** 2, 'peak_mb': peak / 1024 ** 2})
+            self.rows.append(row)
+
+    @staticmethod
+    def add_frame(row, data):
+        """
+        Attach the shape, size and dtypes of the frame a stage produced to its row.
+
+        Parameters:
+        - row (dict): The row yielded by stage().
+        - data (pd.DataFrame): The frame produced by the stage.
+
+        Returns:
+        - pd.DataFrame: The frame itself.
+        """
+        row.update({'rows': data.shape[0], 'cols': data.shape[1], 'frame_mb': frame_memory_mb(data),
+                    'dtypes': ', '.join(f'{k}:{v}' for k, v in data.dtypes.astype(str).value_counts().items())})
+        return data
+
+    def to_frame(self):
+        """
+        Return the collected rows as a DataFrame.
+
+        Returns:
+        - pd.DataFrame: One row per traced stage.
+        """
+        return pd.DataFrame(self.rows, columns=['stage', 'rows', 'cols', 'frame_mb', 'retained_mb', 'peak_mb', 'dtypes'])
@@ -0,0 +1,252 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from src.data.dataset_source import COLUMNAR_FORMATS, read_dataset
+from src.data.preprocess_data import time_control_type, date_sort, frequency_detect, stationarity_table, \
+    editing_index, app_lag_data, app_derived_data, app_diff_data, split_data, build_final_data, split
+from src.features.feature_engineering import date_engineering, date_feature_names
+
+DATASET_FORMATS = {
+    'parquet': 'parquet',
+    'feather': 'ipc',
+    'csv': 'csv'
+}
+
+
+def read_series(file, series_id, ids=None, columns=None, dtypes=None):
+    """
+    Read the rows of some series of a panel file.
+
+    Parquet, Feather/Arrow IPC and CSV files are scanned batch by batch with the series filter pushed down to pyarrow,
+    so only the matching rows are ever materialized. Excel files are read whole and filtered afterwards.
+
+    Parameters:
+    - file (str): The panel file.
+    - series_id (str): The series identifier column.
+    - ids (array-like, optional): The series to read. Defaults to None, which reads every series.
+    - columns (list, optional): The columns to read. Defaults to None, which reads every column.
+    - dtypes (dict, optional): Explicit dtypes of some columns. Defaults to None.
+
+    Returns:
+    - pd.DataFrame: The rows of the requested series.
+    """
+    extension = os.path.splitext(file)[1].lower()
+    dataset_format = DATASET_FORMATS.get(COLUMNAR_FORMATS.get(extension, extension.lstrip('.')))
+    if dataset_format is None:
+        data = read_dataset(file, columns, dtypes)
+        return data[data[series_id].isin(ids)].reset_index(drop=True) if ids is not None else data
+    import pyarrow.dataset as ds
+    series_filter = ds.field(series_id).isin(list(ids)) if ids is not None else None
+    data = ds.dataset(file, format=dataset_format).to_table(columns=columns, filter=series_filter).to_pandas()
+    return data.astype({k: v for k, v in (dtypes or {}).items() if k in data.columns})
+
+
+class PartitionedPipeline:
+    def __init__(self, file, root, series_id, timestamp_column, target, window, window_list, horizon,
+                 partition_size=100, datetime_format=None, dtypes=None, date_cyclical=False, dtype='float64', n_jobs=1):
+        """
+        Initialize the PartitionedPipeline class.
+
+        The out-of-core variant of the Train-tab feature pipeline for panels larger than memory. The panel is processed
+        in partitions of whole series: every partition is read on its own, gets its lag, derived, diff and final
+        features built and is written to <root>/final_data/partition=<k>/part-0.parquet. assemble() then writes the
+        partitions into a memory-mapped feature matrix in (timestamp, series) order, so at most n_jobs partitions are held
+        in memory at any time. Date parts are always ordinal-encoded so that every feature fits the numeric matrix.
+
+        Parameters:
+        - file (str): The panel file (Parquet, Feather/Arrow IPC or CSV for out-of-core reads).
+        - root (str): Directory of the partitioned dataset and the memory-mapped matrix.
+        - series_id (str): The series identifier column; it is not auto-detected, which would need the whole panel.
+        - timestamp_column (str): The timestamp column.
+        - target (str): The target column.
+        - window (int): The window size of the lag and derived features.
+        - window_list (list): The window sizes of the derived features.
+        - horizon (int): The forecast horizon.
+        - partition_size (int, optional): The number of series per partition. Defaults to 100.
+        - datetime_format (str, optional): The strftime format of the timestamp column. Defaults to None.
+        - dtypes (dict, optional): Explicit dtypes of the panel columns. Defaults to None.
+        - date_cyclical (bool, optional): Whether sine/cosine date encodings are added. Defaults to False.
+        - dtype (str, optional): The dtype of the features and of the assembled matrix. Defaults to 'float64'.
+        - n_jobs (int, optional): The number of partitions processed concurrently. Defaults to 1.
+
+        Returns:
+        - None
+        """
+        self.file = file
+        self.root = root
+        self.series_id = series_id
+        self.timestamp_column = timestamp_column
+        self.target = target
+        self.window = window
+        self.window_list = window_list
+        self.horizon = horizon
+        self.partition_size = partition_size
+        self.datetime_format = datetime_format
+        self.dtypes = dtypes
+        self.date_cyclical = date_cyclical
+        self.dtype = dtype
+        self.n_jobs = n_jobs
+        self.series = None
+        self.time_type = None
+        self.frequency = None
+        self.manifest = None
+
+    def partitions(self):
+        """
+        Split the series identifiers into partitions.
+
+        Returns:
+        - list: One array of series identifiers per partition.
+        """
+        return [self.series[i:i + self.partition_size] for i in range(0, len(self.series), self.partition_size)]
+
+    def load_partition(self, ids, columns=None):
+        """
+        Read the rows of some series and sort them by timestamp and series.
+
+        Parameters:
+        - ids (array-like): The series to read.
+        - columns (list, optional): The columns to read. Defaults to None, which reads every column.
+
+        Returns:
+        - pd.DataFrame: The sorted rows.
+        """
+        data = read_series(self.file, self.series_id, ids, columns, self.dtypes)
+        data = time_control_type(data, self.timestamp_column, self.datetime_format)
+        return date_sort(data, self.timestamp_column, self.series_id)
+
+    def scan(self):
+        """
+        Read the series identifiers and detect the frequency of the panel from its first partition.
+
+        Returns:
+        - PartitionedPipeline: The pipeline itself.
+        """
+        ids = read_series(self.file, self.series_id, columns=[self.series_id], dtypes=self.dtypes)[self.series_id]
+        self.series = np.sort(ids.unique())
+        first = self.load_partition(self.partitions()[0], [self.series_id, self.timestamp_column])
+        self.time_type, self.frequency = frequency_detect(first, self.timestamp_column)
+        return self
+
+    def stationarity(self):
+        """
+        Run the per-series stationarity tests partition by partition, reading only the timestamp and target columns.
+
+        Returns:
+        - pd.DataFrame: The stationarity_table rows of every series.
+        """
+        columns = [self.series_id, self.timestamp_column, self.target]
+        return pd.concat([stationarity_table(self.load_partition(ids, columns), self.target, self.series_id,
+                                             self.timestamp_column, n_jobs=self.n_jobs)
+                          for ids in self.partitions()])
+
+    def build_partition(self, number, ids, isStationary_adf, isStationary_kpss=True):
+        """
+        Build the final features of one partition and write them as a Parquet file.
+
+        Parameters:
+        - number (int): The partition number.
+        - ids (array-like): The series of the partition.
+        - isStationary_adf (bool): The result of the ADF vote on the target.
+        - isStationary_kpss (bool, optional): The result of the KPSS vote; diff features are added when False.
+          Defaults to True.
+
+        Returns:
+        - dict: The path, number of rows and columns of the written partition.
+        """
+        data = self.load_partition(ids)
+        data = date_engineering(data, self.timestamp_column, 'ordinal', self.date_cyclical)
+        data = editing_index(data, self.timestamp_column, self.series_id)
+        date_cols = date_feature_names(self.date_cyclical)
+        num_cols = [x for x in data.select_dtypes(include=['number']).columns.tolist() if x not in date_cols]
+        lagged_data = app_lag_data(data, self.window, num_cols, self.series_id, self.timestamp_column,
+                                   dtype=self.dtype)
+        derived_data = app_derived_data(data, num_cols, self.window, self.window_list, self.time_type, self.frequency,
+                                        self.series_id, self.timestamp_column, dtype=self.dtype)
+        data = split_data(data, self.window, len(ids))
+        diff_data = None
+        if not isStationary_kpss:
+            diff_data = app_diff_data(data, self.window, lagged_data, derived_data, self.target, self.time_type,
+                                      dtype=self.dtype)
+        final_data = build_final_data(data, lagged_data, derived_data, self.target, isStationary_adf, diff_data)
+        path = os.path.join(self.root, 'final_data', f'partition={number:05d}', 'part-0.parquet')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        final_data.to_parquet(path, engine='pyarrow')
+        return {'path': path, 'rows': len(final_data), 'columns': final_data.columns.tolist()}
+
+    def build(self, isStationary_adf, isStationary_kpss=True):
+        """
+        Build and write the final features of every partition, replacing a previous partitioned dataset.
+
+        Parameters:
+        - isStationary_adf (bool): The result of the ADF vote on the target.
+        - isStationary_kpss (bool, optional): The result of the KPSS vote. Defaults to True.
+
+        Returns:
+        - dict: The manifest of the dataset, also written to <root>/manifest.json.
+        """
+        if self.series is None:
+            self.scan()
+        shutil.rmtree(os.path.join(self.root, 'final_data'), ignore_errors=True)
+        partitions = Parallel(n_jobs=self.n_jobs)(delayed(self.build_partition)(i, ids, isStationary_adf,
+                                                                                isStationary_kpss)
+                                                  for i, ids in enumerate(self.partitions()))
+        self.manifest = {'file': self.file, 'series_id': self.series_id, 'target': self.target,
+                         'series': self.series.tolist(), 'partitions': partitions}
+        with open(os.path.join(self.root, 'manifest.json'), 'w') as handle:
+            json.dump(self.manifest, handle, indent=2, default=str)
+        return self.manifest
+
+    def assemble(self):
+        """
+        Write the partitions into a memory-mapped feature matrix in (timestamp, series) order and split it into features
+        and horizon targets the way split() does. Only one partition is held in memory at a time; the features are
+        returned as a DataFrame over the read-only memory map, so folds only copy the rows they select.
+
+        Returns:
+        - tuple: X (pd.DataFrame over <root>/matrix/features.npy) and y (pd.DataFrame of the horizon targets).
+        """
+        partitions = self.manifest['partitions']
+        columns = [x for x in partitions[0]['columns'] if x != self.target]
+        first = pd.read_parquet(partitions[0]['path'], columns=[self.target])
+        dates = first.index.get_level_values(self.timestamp_column).unique().sort_values()
+        n_series = len(self.series)
+        n_rows = len(dates) * n_series
+        if sum(x['rows'] for x in partitions) != n_rows:
+            raise ValueError('The out-of-core pipeline needs a balanced panel: every series must cover the same '
+                             'timestamps')
+        path = os.path.join(self.root, 'matrix', 'features.npy')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        features = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=(n_rows, len(columns)))
+        target = np.empty(n_rows)
+        for partition in partitions:
+            data = pd.read_parquet(partition['path'])
+            positions = dates.get_indexer(data.index.get_level_values(self.timestamp_column)) * n_series \
+                + np.searchsorted(self.series, data.index.get_level_values(self.series_id))
+            features[positions] = data[columns].to_numpy(dtype=self.dtype)
+            target[positions] = data[self.target].to_numpy()
+            del data
+        features.flush()
+        del features
+        index = pd.MultiIndex.from_product([dates, self.series], names=[self.timestamp_column, self.series_id])
+        _, y = split(pd.DataFrame({self.target: target}, index=index), self.target, self.horizon, n_series)
+        start = int(self.horizon) * n_series
+        X = pd.DataFrame(np.load(path, mmap_mode='r')[start:], index=index[start:], columns=columns)
+        return X, y
+
+    def run(self, isStationary_adf, isStationary_kpss=True):
+        """
+        Build the partitioned dataset and assemble the memory-mapped matrix.
+
+        Parameters:
+        - isStationary_adf (bool): The result of the ADF vote on the target.
+        - isStationary_kpss (bool, optional): The result of the KPSS vote. Defaults to True.
+
+        Returns:
+        - tuple: X and y, as returned by assemble().
+        """
+        self.build(isStationary_adf, isStationary_kpss)
+        return self.assemble()
@@ -1,15 +1,19 @@
 # -*- coding: utf-8 -*-
+import warnings
 import pandas as pd
 import numpy as np
-from collections import Counter
 from statsmodels.tsa.stattools import adfuller, kpss
-from tqdm import tqdm
 from functools import partial, reduce
+from joblib import Parallel, delayed, effective_n_jobs
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.multioutput import MultiOutputRegressor
+from sklearn.base import clone
+from src.models.early_stopping import early_stopping_fit_params
+from src.models.multi_horizon import NativeMultiOutputRegressor, HorizonStackedRegressor
+from src.features.target_transform import SignedTransformer, signed_apply
 
 def make_train_test_splits(X, y, test_split,unique_len):
     """
@@ -37,21 +41,58 @@ def make_train_test_splits(X, y, test_split,unique_len):
     return X_train, X_test, y_train, y_test
 
 
-def time_control_type(data,col):
+DATETIME_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%m-%d-%Y', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y', '%d.%m.%Y',
+                    '%Y-%m-%d %H:%M:%S', '%d-%m-%Y %H:%M:%S', '%Y%m%d']
+
+
+def infer_datetime_format(values, sample_size=1000):
+    """
+    This function infers the format of a datetime column from a sample of its distinct values. When several candidate
+    formats parse the sample (e.g. day-first and month-first dates whose days are all below 13), the one giving the most
+    regular spacing between consecutive timestamps is chosen.
+
+    Parameters:
+
+    values (pandas.Series): The datetime column as strings.
+    sample_size (int, optional): The number of distinct values the inference looks at. Defaults to 1000.
+    Returns:
+
+    datetime_format (str): The inferred format, or None when no candidate in DATETIME_FORMATS parses the sample.
+    """
+    sample = pd.Series(values.dropna().unique()[:sample_size]).astype(str)
+    best_format, best_gaps = None, None
+    for datetime_format in DATETIME_FORMATS:
+        try:
+            parsed = pd.to_datetime(sample, format=datetime_format)
+        except (ValueError, TypeError):
+            continue
+        gaps = len(np.unique(np.diff(np.sort(parsed.values.astype('datetime64[s]').astype('int64')))))
+        if best_gaps is None or gaps < best_gaps:
+            best_format, best_gaps = datetime_format, gaps
+    return best_format
+
+
+def time_control_type(data,col,datetime_format=None):
     """
     This function is designed to ensure that a specified column in a DataFrame is of the datetime type.
-     If the column is not already in datetime format, it converts the data to datetime.
+     If the column is not already in datetime format, it converts the data to datetime, parsing every distinct value once.
 
     Parameters:
 
     data (pandas.DataFrame): The DataFrame containing the target column.
     col (str): The name of the column to be checked and converted to datetime if necessary.
+    datetime_format (str, optional): The strftime format of the column (e.g. '%d-%m-%Y'). If None, it is inferred from
+     a sample of the column with infer_datetime_format. Defaults to None.
     Returns:
 
     data (pandas.DataFrame): The DataFrame with the specified column in datetime format.
     """
-    if str(data[col].dtypes) not in '[ns]':
-        data[col]=pd.to_datetime(data[col])
+    if not pd.api.types.is_datetime64_any_dtype(data[col]):
+        if datetime_format is None:
+            datetime_format = infer_datetime_format(data[col])
+        codes, uniques = pd.factorize(data[col])
+        parsed = pd.DatetimeIndex(pd.to_datetime(uniques, format=datetime_format))
+        data[col] = pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=data.index)
     return data
 
 
@@ -84,35 +125,42 @@ def time_len_control(data,col):
     bool: Returns True if there are duplicate values in the datetime column, and False otherwise.
     """
     firstdateminusenddate = len(data[col])
-    len_datetime = len(data[col].unique())
+    len_datetime = data[col].nunique(dropna=False)
     if len_datetime == firstdateminusenddate:
         return False
     else:
         return True
 
-def auto_detect(df, selected_datetime):
+def auto_detect(df, selected_datetime, sample_size=None):
     """
-    This function automatically detects potential time series identifier columns in a DataFrame based on the uniqueness of concatenated values.
+    This function automatically detects potential time series identifier columns in a DataFrame: a column qualifies when
+    its number of distinct values equals the number of rows per timestamp and every (column, timestamp) pair is unique.
+    Both checks are hash-based; on inputs larger than sample_size, columns already failing them on a row sample are
+    rejected before the full check.
 
     Parameters:
 
     df (pandas.DataFrame): The DataFrame to be analyzed.
     selected_datetime (str): The name of the datetime column for uniqueness comparison.
+    sample_size (int, optional): The number of sampled rows used to reject columns early. Defaults to None (no sampling).
     Returns:
 
     unique_series_id (list): A list of column names that are potential time series identifiers.
     """
-    df = df.sort_values(by=[selected_datetime],ascending=True)
-    unique_df_time = len(df[selected_datetime].unique())
-    df_time = len(df[selected_datetime])
-    a = int(df_time / unique_df_time)
+    if df[selected_datetime].isnull().any():
+        return []
+    df_time = len(df)
+    a = int(df_time / df[selected_datetime].nunique())
+    candidates = [col for col in df.columns if col != selected_datetime]
+    if sample_size and df_time > sample_size:
+        sample = df.sample(n=sample_size, random_state=0)
+        candidates = [col for col in candidates if sample[col].nunique(dropna=False) <= a
+                      and not sample.duplicated(subset=[col, selected_datetime]).any()]
     unique_series_id = []
-    for col in df.columns:
-        if a == len(df[col].unique()):
-            if df[col].isnull().sum() == 0 and df[selected_datetime].isnull().sum() == 0:
-                df["concated"] = df[col].astype(str) + df[selected_datetime].astype(str)
-                if df_time == len(df["concated"].unique()):
-                    unique_series_id.append(col)
+    for col in candidates:
+        if df[col].nunique(dropna=False) == a and not df[col].isnull().any():
+            if not df.duplicated(subset=[col, selected_datetime]).any():
+                unique_series_id.append(col)
     return unique_series_id
 def frequency_detect(data, selected_datetime):
     """
@@ -128,10 +176,10 @@ def frequency_detect(data, selected_datetime):
     time_type (str): The dominant time unit (e.g., 'years', 'quarters', 'months', 'weeks', 'days', 'hours', 'minutes', 'seconds').
     frequency (int): The corresponding frequency of the dominant time unit.
     """
-    dates = data[selected_datetime].unique()
-    frequencies = [int(int((dates[x + 1] - dates[x])) / (1000000000)) for x in range(0, len(dates) - 1)]
+    dates = np.sort(data[selected_datetime].dropna().unique().astype('datetime64[s]').astype('int64'))
+    frequencies, counts = np.unique(np.diff(dates), return_counts=True)
     time_type = ''
-    frequency = list(Counter(frequencies).most_common(1)[0])[0]
+    frequency = int(frequencies[np.argmax(counts)])
     if frequency >= 31536000:
         time_type = 'years' if frequency % 31536000 == 0 else 'quarters'
     elif frequency >= 7948800:
@@ -233,6 +281,86 @@ def KPSS_Test(data, target, selected_datetime_feature, trend, SignificanceLevel=
     return isStationary_kpss
 
 
+def series_stationarity(values, SignificanceLevel=.05, kpss_regression='ct', kpss_lags='auto'):
+    """
+    This function runs the ADF and KPSS tests on a single series.
+
+    Parameters:
+
+    values (array-like): The time-ordered values of the series.
+    SignificanceLevel (float, optional): The significance level of both tests. Defaults to 0.05.
+    kpss_regression (str, optional): The KPSS regression, "c" or "ct" (see KPSS_Test). Defaults to 'ct'.
+    kpss_lags (str or int, optional): The KPSS lags; 'auto' lets statsmodels choose them from the series length.
+     Defaults to 'auto'.
+    Returns:
+
+    results (dict): The statistics, p-values and lags of both tests and their stationarity decisions.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    adfTest = adfuller(values, autolag='AIC')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        kpsstest = kpss(values, regression=kpss_regression, nlags=kpss_lags)
+    return {'n_obs': len(values),
+            'adf_statistic': adfTest[0], 'adf_p_value': adfTest[1], 'adf_lags': adfTest[2],
+            'isStationary_adf': bool(adfTest[1] < SignificanceLevel),
+            'kpss_statistic': kpsstest[0], 'kpss_p_value': kpsstest[1], 'kpss_lags': kpsstest[2],
+            'isStationary_kpss': bool(kpsstest[1] >= SignificanceLevel)}
+
+
+def stationarity_table(data, target, series_id, datetime_feature, SignificanceLevel=.05, kpss_regression='ct',
+                       kpss_lags='auto', n_jobs=1):
+    """
+    This function tests the stationarity of the target of every series separately and collects the results in one table.
+
+    Parameters:
+
+    data (pandas.DataFrame): The panel, with the series identifier and datetime feature as columns or index levels.
+    target (str): The name of the column to be tested.
+    series_id (str): The name of the series identifier.
+    datetime_feature (str): The name of the datetime feature the series are ordered by.
+    SignificanceLevel (float, optional): The significance level of both tests. Defaults to 0.05.
+    kpss_regression (str, optional): The KPSS regression, "c" or "ct". Defaults to 'ct'.
+    kpss_lags (str or int, optional): The KPSS lags. Defaults to 'auto'.
+    n_jobs (int, optional): The number of worker processes series partitions are spread over. Defaults to 1.
+    Returns:
+
+    table (pandas.DataFrame): One row of test results per series, indexed by the series identifier.
+    """
+    if n_jobs != 1:
+        return parallel_series_apply(stationarity_table, data, series_id, n_jobs, target, series_id, datetime_feature,
+                                     SignificanceLevel, kpss_regression, kpss_lags)
+    data_1 = data.reset_index() if series_id not in data.columns else data
+    data_1 = data_1.sort_values(by=[series_id, datetime_feature], kind='mergesort')
+    rows = {key: series_stationarity(group.to_numpy(), SignificanceLevel, kpss_regression, kpss_lags)
+            for key, group in data_1.groupby(series_id, sort=True)[target]}
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = series_id
+    return table
+
+
+def stationarity_vote(table, threshold=.5):
+    """
+    This function reduces a per-series stationarity table to panel-level decisions.
+
+    Parameters:
+
+    table (pandas.DataFrame): The output of stationarity_table.
+    threshold (float, optional): The share of series that must be stationary for the panel to count as stationary.
+     Defaults to 0.5.
+    Returns:
+
+    isStationary_adf (bool): Whether the ADF test finds enough series stationary.
+    isStationary_kpss (bool): Whether the KPSS test finds enough series stationary.
+    """
+    isStationary_adf = bool(table['isStationary_adf'].mean() >= threshold)
+    isStationary_kpss = bool(table['isStationary_kpss'].mean() >= threshold)
+    print(f"Stationary series (ADF) : {table['isStationary_adf'].sum()}/{len(table)} -> {isStationary_adf}")
+    print(f"Stationary series (KPSS) : {table['isStationary_kpss'].sum()}/{len(table)} -> {isStationary_kpss}")
+    return isStationary_adf, isStationary_kpss
+
+
 def editing_index(data, col, col2):
     """
     This function sets a multi-level index for a DataFrame using two specified columns and sorts the DataFrame based on this multi-level index.
@@ -250,6 +378,47 @@ def editing_index(data, col, col2):
     return data
 
 
+def ensure_series_index(data, col, col2):
+    """
+    This function returns the DataFrame indexed by (col, col2) and sorted, reusing it without a copy when it already is.
+
+    Parameters:
+
+    data (pandas.DataFrame): The DataFrame to be indexed.
+    col (str): The name of the first column for the multi-level index.
+    col2 (str): The name of the second column for the multi-level index.
+    Returns:
+
+    data (pandas.DataFrame): The DataFrame with a sorted (col, col2) multi-level index.
+    """
+    if list(data.index.names) == [col, col2] and data.index.is_monotonic_increasing:
+        return data
+    return editing_index(data.reset_index(), col, col2)
+
+
+def downcast_frame(data, exclude=None):
+    """
+    This function shrinks the numeric columns of a DataFrame in place: float64 columns become float32 and int64 columns
+    become the smallest integer type that holds their values.
+
+    Parameters:
+
+    data (pandas.DataFrame): The DataFrame to be downcast.
+    exclude (list, optional): Columns kept at full width (e.g. the target). Defaults to None.
+    Returns:
+
+    data (pandas.DataFrame): The downcast DataFrame.
+    """
+    exclude = [] if exclude is None else exclude
+    for col in data.select_dtypes(include=['float64']).columns:
+        if col not in exclude:
+            data[col] = data[col].astype('float32')
+    for col in data.select_dtypes(include=['int64']).columns:
+        if col not in exclude:
+            data[col] = pd.to_numeric(data[col], downcast='integer')
+    return data
+
+
 def derived_lag_features(data, lag_features, lag_bound=5):
     """
     This function generates lagged features for specified columns in a DataFrame.
@@ -270,9 +439,94 @@ def derived_lag_features(data, lag_features, lag_bound=5):
     return data.loc[:, data.columns.str.contains('_lag_')]
 
 
-def app_lag_data(data, WINDOW, derived_lag_features_cols,series_id,datetime_feature):
+def window_bounds(WINDOW):
+    """
+    This function resolves the row offsets implied by the window size, mirroring the sliding-window rules used by the lag,
+    derived and split stages.
+
+    Parameters:
+
+    WINDOW (int): The window size used for feature derivation.
+    Returns:
+
+    start (int): The position inside each series of the first row that receives features.
+    lag_bound (int): The number of lags generated per column.
+    span (int): The number of rows (including the current one) visible to the rolling statistics.
+    """
+    WINDOW = int(WINDOW)
+    if WINDOW + 1 < 7:
+        return WINDOW + 1, WINDOW, WINDOW + 1
+    return WINDOW, 5, WINDOW
+
+
+def vectorized_lag_features(data, lag_features, lag_bound, series_id, dtype='float64'):
+    """
+    This function generates lagged features for every series at once with a grouped shift over the series identifier.
+
+    Parameters:
+
+    data (pandas.DataFrame): The DataFrame indexed by (datetime, series_id) and sorted by date inside each series.
+    lag_features (list): A list of column names for which lagged features will be generated.
+    lag_bound (int): The maximum number of lagged features to be created.
+    series_id (str): The name of the index level representing the series identifier.
+    dtype (str, optional): The dtype of the generated features. Defaults to 'float64'.
+    Returns:
+
+    lagged_data (pandas.DataFrame): A DataFrame containing only the generated lagged features.
+    """
+    grouped = data[lag_features].astype(dtype, copy=False).groupby(level=series_id, sort=False)
+    lags = []
+    for lag in range(1, int(lag_bound) + 1):
+        shifted = grouped.shift(lag)
+        shifted.columns = [f'{col}_lag_{lag}' for col in lag_features]
+        lags.append(shifted)
+    lagged_data = pd.concat(lags, axis=1)
+    columns = [f'{col}_lag_{lag}' for col in lag_features for lag in range(1, int(lag_bound) + 1)]
+    return lagged_data[columns]
+
+
+def series_partitions(data, series_id, n_partitions):
+    """
+    This function splits a panel into contiguous groups of whole series so that each group can be processed independently.
+
+    Parameters:
+
+    data (pandas.DataFrame): The DataFrame containing the series identifier as a column or index level.
+    series_id (str): The name of the column representing the series identifier.
+    n_partitions (int): The number of partitions to create.
+    Returns:
+
+    partitions (list): A list of DataFrames, each holding every row of its series.
+    """
+    data_1 = data.reset_index()
+    series = data_1[series_id].unique()
+    return [data_1[data_1[series_id].isin(chunk)] for chunk in np.array_split(series, n_partitions) if len(chunk)]
+
+
+def parallel_series_apply(func, data, series_id, n_jobs, *args, **kwargs):
+    """
+    This function runs a per-series feature function on series partitions in a process pool and merges the results in
+    index order, so the output does not depend on the number of workers.
+
+    Parameters:
+
+    func (callable): The feature function, called as func(partition, *args, **kwargs).
+    data (pandas.DataFrame): The DataFrame to be partitioned.
+    series_id (str): The name of the column representing the series identifier.
+    n_jobs (int): The number of worker processes (-1 uses every core).
+    Returns:
+
+    result (pandas.DataFrame): The concatenated, index-sorted results of every partition.
+    """
+    partitions = series_partitions(data, series_id, effective_n_jobs(n_jobs))
+    results = Parallel(n_jobs=n_jobs)(delayed(func)(partition, *args, **kwargs) for partition in partitions)
+    return pd.concat(results).sort_index()
+
+
+def app_lag_data(data, WINDOW, derived_lag_features_cols,series_id,datetime_feature, n_jobs=1, dtype='float64'):
     """
     This function applies lag features to a DataFrame based on specified window size, series identifier, and datetime feature.
+    All series are processed in a single grouped pass, so the cost grows linearly with rows x lags.
 
     Parameters:
 
@@ -281,33 +535,20 @@ def app_lag_data(data, WINDOW, derived_lag_features_cols,series_id,datetime_feat
     derived_lag_features_cols (list): A list of column names for which lag features will be derived.
     series_id (str): The name of the column representing the series identifier.
     datetime_feature (str): The name of the datetime feature used for sorting and lag feature derivation.
+    n_jobs (int, optional): The number of worker processes series partitions are spread over. Defaults to 1.
+    dtype (str, optional): The dtype of the lag features, e.g. 'float32' to halve their memory. Defaults to 'float64'.
     Returns:
 
     lagged_data (pandas.DataFrame): The DataFrame with applied lag features.
     """
-    data_1 = data.copy()
-    data_2 = []
-    data_1 = data_1.reset_index()
-    for seri in data_1[series_id].unique():
-        v = int(WINDOW) + 1
-        data_3 = pd.DataFrame()
-        data_4 = data_1[data_1[series_id] == seri]
-        data_4 = editing_index(data_4, datetime_feature,series_id)
-        if v < 7:
-            for i in tqdm(range(len(data_4) - int(WINDOW))):
-                data_5 = derived_lag_features(data_4[v - int(WINDOW):v + 1], derived_lag_features_cols,
-                                                 lag_bound=WINDOW).dropna()
-                v += 1
-                data_3 = data_3.append(data_5)
-            data_2.append(data_3)
-        else:
-            for i in tqdm(range(len(data_4) - int(WINDOW))):
-                data_5 = derived_lag_features(data_4[v - int(WINDOW):v][-6:],
-                                                 derived_lag_features_cols).dropna()
-                v += 1
-                data_3 = data_3.append(data_5)
-            data_2.append(data_3)
-    lagged_data = pd.concat(data_2)
+    if n_jobs != 1:
+        return parallel_series_apply(app_lag_data, data, series_id, n_jobs, WINDOW, derived_lag_features_cols, series_id,
+                                     datetime_feature, dtype=dtype)
+    start, lag_bound, _ = window_bounds(WINDOW)
+    data_1 = ensure_series_index(data, datetime_feature, series_id)
+    lagged_data = vectorized_lag_features(data_1, derived_lag_features_cols, lag_bound, series_id, dtype)
+    position = data_1.groupby(level=series_id, sort=False).cumcount()
+    lagged_data = lagged_data[(position >= start).values].dropna()
     lagged_data = lagged_data.sort_index()
     return lagged_data
 
@@ -371,10 +612,66 @@ def derive_features(data, derivation_lagged_cols, win, window_list,time_type, fr
     return data
 
 
-def app_derived_data(data, derived_lag_features_cols, WINDOW, window_list,time_type, frequency,series_id,datetime_feature):
+ROLLING_FUNCTIONS = {
+    'min': 'min',
+    'max': 'max',
+    'mean': 'mean',
+    'std': 'std',
+    'median': 'median'
+}
+
+
+def rolling_features(data, derivation_lagged_cols, span, window_list, time_type, frequency, series_id, functions=None,
+                     dtype='float64'):
+    """
+    This function derives rolling statistical features for every series in one grouped rolling pass.
+
+    Parameters:
+
+    data (pandas.DataFrame): The DataFrame indexed by (datetime, series_id) and sorted by date inside each series.
+    derivation_lagged_cols (list): A list of column names for which statistical features will be derived.
+    span (int): The number of rows visible to each rolling window; larger windows are clipped to it.
+    window_list (list): A list of window sizes for feature derivation.
+    time_type (str): The type of time unit used for window sizes (e.g., 'years', 'quarters', 'months', 'weeks', 'days', 'hours', 'minutes', 'seconds').
+    frequency (int): The frequency of the data collection in the specified time unit.
+    series_id (str): The name of the index level representing the series identifier.
+    functions (dict, optional): Mapping of statistic name to a pandas rolling method name or a callable applied to the raw
+     window values. Defaults to ROLLING_FUNCTIONS.
+    dtype (str, optional): The dtype each statistic block is stored in. Defaults to 'float64'.
+    Returns:
+
+    derived_data (pandas.DataFrame): A DataFrame containing only the derived statistical features.
+    """
+    functions = ROLLING_FUNCTIONS if functions is None else functions
+    time_num = time_type_detect(time_type)
+    # Grouped rolling results are indexed differently across pandas versions (1.1 keeps only the series level), so
+    # rows are put in (series, date) order first and the results are written back by position.
+    codes = pd.factorize(data.index.get_level_values(series_id), sort=True)[0]
+    order = np.lexsort((np.arange(len(data)), codes))
+    grouped = data[derivation_lagged_cols].iloc[order].groupby(level=series_id, sort=True)
+    stats = []
+    for win in window_list:
+        rolling = grouped.rolling(window=min(int(win), int(span)), min_periods=1)
+        for function_name, function in functions.items():
+            if isinstance(function, str):
+                stat = getattr(rolling, function)()
+            else:
+                stat = rolling.apply(function, raw=True)
+            values = np.empty((len(data), len(derivation_lagged_cols)), dtype=dtype)
+            values[order] = stat.to_numpy()
+            stat = pd.DataFrame(values, index=data.index,
+                                columns=[f'{j}_stat_{function_name}_{int(win * frequency / time_num)}_{time_type}'
+                                         for j in derivation_lagged_cols])
+            stats.append(stat)
+    derived_data = pd.concat(stats, axis=1)
+    return derived_data
+
+
+def app_derived_data(data, derived_lag_features_cols, WINDOW, window_list,time_type, frequency,series_id,datetime_feature,
+                     functions=None, n_jobs=1, dtype='float64'):
     """
     This function applies derived features to a DataFrame based on specified window size, window list, time type,
-    frequency, series identifier, and datetime feature.
+    frequency, series identifier, and datetime feature. All series and windows are computed in a single grouped rolling pass.
 
     Parameters:
 
@@ -386,68 +683,67 @@ def app_derived_data(data, derived_lag_features_cols, WINDOW, window_list,time_t
     frequency (int): The frequency of the time series data.
     series_id (str): The name of the column representing the series identifier.
     datetime_feature (str): The name of the datetime feature used for sorting and feature derivation.
+    functions (dict, optional): The rolling aggregations to compute. Defaults to ROLLING_FUNCTIONS.
+    n_jobs (int, optional): The number of worker processes series partitions are spread over. Defaults to 1.
+    dtype (str, optional): The dtype of the derived features, e.g. 'float32' to halve their memory. Defaults to 'float64'.
     Returns:
 
     derived_data (pandas.DataFrame): The DataFrame with applied derived features.
     """
-    data_1 = data.copy()
-    data_1 = data_1.reset_index()
-    derives = []
-    for seri in data_1[series_id].unique():
-        v = int(WINDOW) + 1
-        data_2 = pd.DataFrame()
-        data_3 = data_1[data_1[series_id] == seri]
-        data_3 = editing_index(data_3, datetime_feature, series_id)
-        if v < 7:
-            for i in tqdm(range(len(data_3) - int(WINDOW))):
-                data_4 = derive_features(data_3[v - int(WINDOW):v + 1], derived_lag_features_cols, WINDOW,window_list,time_type,frequency).iloc[
-                    -1].to_frame().T
-                v += 1
-                data_2 = data_2.append(data_4)
-            derives.append(data_2)
-        else:
-            for i in tqdm(range(len(data_3) - int(WINDOW))):
-                data_4 = derive_features(data_3[v - int(WINDOW):v], derived_lag_features_cols, WINDOW,window_list,time_type,frequency).iloc[
-                    -1].to_frame().T
-                v += 1
-                data_2 = data_2.append(data_4)
-            derives.append(data_2)
-    derived_data = pd.concat(derives)
-    derived_data = derived_data.loc[:, derived_data.columns.str.contains('stat_')]
-    derived_data = derived_data.astype('float64')
+    if n_jobs != 1:
+        return parallel_series_apply(app_derived_data, data, series_id, n_jobs, derived_lag_features_cols, WINDOW,
+                                     window_list, time_type, frequency, series_id, datetime_feature, functions=functions,
+                                     dtype=dtype)
+    start, _, span = window_bounds(WINDOW)
+    data_1 = ensure_series_index(data, datetime_feature, series_id)
+    derived_data = rolling_features(data_1, derived_lag_features_cols, span, window_list, time_type, frequency, series_id,
+                                    functions=functions, dtype=dtype)
+    position = data_1.groupby(level=series_id, sort=False).cumcount()
+    derived_data = derived_data[(position >= start).values]
     derived_data = derived_data.sort_index()
     return derived_data
 
 
-def app_diff_data(df, window, lagged_data, derived_data, target, time_type):
+def app_diff_data(df, window, lagged_data, derived_data, target, time_type, dtype='float64'):
     """
-    This function applies difference features to a given dataset based on lagged and derived features.
+    This function builds the difference features of the target from its lagged and derived features: the target minus
+    every target lag and target statistic, and every target lag and statistic minus the rolling mean of the window. All
+    columns are computed as whole-matrix numpy operations written into one preallocated block, so the cost stays linear
+    as the lag and window lists grow.
 
     Parameters:
 
-    df (pandas.DataFrame): The DataFrame to which difference features will be applied.
+    df (pandas.DataFrame): The DataFrame holding the target, indexed like the rows the features are built for.
     window (int): The window size used for feature derivation.
     lagged_data (pandas.DataFrame): A DataFrame containing lagged features.
     derived_data (pandas.DataFrame): A DataFrame containing derived statistical features.
     target (str): The name of the target variable for which difference features will be created.
     time_type (str): The type of time unit used for window sizes (e.g., 'years', 'quarters', 'months', 'weeks', 'days', 'hours', 'minutes', 'seconds').
+    dtype (str, optional): The dtype of the difference features. Defaults to 'float64'.
     Returns:
 
     data (pandas.DataFrame): A DataFrame containing the applied difference features.
     """
-    data = df.copy()
-    lag_data_target_columns = [x for x in lagged_data.columns if target in x]
-    derived_diff_inp_column = derived_data[f'{target}_stat_mean_{window}_{time_type}']
-    derived_data_target_columns = [x for x in derived_data.columns if target in x and derived_diff_inp_column.name not in x]
-    for i in lag_data_target_columns:
-        data[f'{target}_diff_{i.replace(target + "_", "", 1)}'] = data[target] - lagged_data[i]
-        data[f'{target}_{i.replace(target + "_", "", 1)}_diff_{derived_diff_inp_column.name}'] = lagged_data[
-                                                                                                     i] - derived_diff_inp_column
-    for k in derived_data_target_columns:
-        data[f'{target}_diff_{k.replace(target + "_", "", 1)}'] = data[target] - derived_data[k]
-        data[f'{target}_{k.replace(target + "_", "", 1)}_diff_{derived_diff_inp_column.name}'] = derived_data[
-                                                                                                     k] - derived_diff_inp_column
-    data = data.loc[:, data.columns.str.contains('diff')]
+    mean_column = f'{target}_stat_mean_{window}_{time_type}'
+    lag_columns = [x for x in lagged_data.columns if target in x]
+    derived_columns = [x for x in derived_data.columns if target in x and mean_column not in x]
+    if not lagged_data.index.equals(df.index):
+        lagged_data = lagged_data.reindex(df.index)
+    if not derived_data.index.equals(df.index):
+        derived_data = derived_data.reindex(df.index)
+    sources = np.empty((len(df), len(lag_columns) + len(derived_columns)), dtype=dtype)
+    sources[:, :len(lag_columns)] = lagged_data[lag_columns].to_numpy(dtype=dtype)
+    sources[:, len(lag_columns):] = derived_data[derived_columns].to_numpy(dtype=dtype)
+    values = df[target].to_numpy(dtype=dtype)[:, None]
+    mean = derived_data[mean_column].to_numpy(dtype=dtype)[:, None]
+    diffs = np.empty((len(df), 2 * sources.shape[1]), dtype=dtype)
+    np.subtract(values, sources, out=diffs[:, 0::2])
+    np.subtract(sources, mean, out=diffs[:, 1::2])
+    columns = []
+    for i in lag_columns + derived_columns:
+        suffix = i.replace(target + "_", "", 1)
+        columns += [f'{target}_diff_{suffix}', f'{target}_{suffix}_diff_{mean_column}']
+    data = pd.DataFrame(diffs, index=df.index, columns=columns)
     return data
 
 
@@ -466,7 +762,7 @@ def merge_data(data, lagged_data, derived_data, diff_data=None):
   final_data (pandas.DataFrame): A DataFrame containing the merged data.
   """
     list_of_datas = [data, lagged_data, derived_data]
-    if diff_data:
+    if diff_data is not None:
         list_of_datas.append(diff_data)
     merge = partial(pd.merge, left_index=True, right_index=True)
     final_data = reduce(merge, list_of_datas)
@@ -474,8 +770,9 @@ def merge_data(data, lagged_data, derived_data, diff_data=None):
 
 def trend_removal_log(data,target_list):
     """
-   This function performs trend removal by taking the logarithm of the absolute values of specified target columns.
-    If negative values are present in the original data, the function adjusts for them before applying the logarithm.
+   This function performs trend removal with a sign-preserving logarithm, sign(x) * log1p(|x|), of the specified target
+    columns and renames them with a "_log" suffix. The transform is vectorized. Only target-derived features are
+    transformed, never the target itself, so predictions need no inverse transform.
 
    Parameters:
 
@@ -485,18 +782,31 @@ def trend_removal_log(data,target_list):
 
    data (pandas.DataFrame): The DataFrame with trend-removed columns after applying logarithm.
    """
-    negative_values = []
-    [[negative_values.append({column: x}) for x in range(len(data)) if data[column][x] < 0] for index, column in enumerate(data[target_list])]
-    data[target_list] = abs(data[target_list])
-    data[target_list] = np.log1p(data[target_list])
-    if not negative_values:
-        [data.rename({x: f"{x}_log"}, axis=1, inplace=True) for x in data[target_list].columns.tolist()]
-        return data
-    for i in negative_values:
-        for key, value in i.items():
-            data[key][value] = data[key][value] * int(-1)
-    [data.rename({x: f"{x}_log"}, axis=1, inplace=True) for x in data[target_list].columns.tolist()]
-    return data
+    return SignedTransformer('log1p', target_list, '_log').fit_transform(data)
+
+
+def build_final_data(data, lagged_data, derived_data, target, isStationary_adf, diff_data=None):
+    """
+    This function assembles the final feature matrix by merging the base, lagged and derived data and applying the log trend
+    removal to the target-derived columns when the ADF test reports a non-stationary target.
+
+    Parameters:
+
+    data (pandas.DataFrame): The primary DataFrame to which others will be merged.
+    lagged_data (pandas.DataFrame): A DataFrame containing lagged features.
+    derived_data (pandas.DataFrame): A DataFrame containing derived statistical features.
+    target (str): The name of the target variable.
+    isStationary_adf (bool): The result of the ADF test on the target.
+    diff_data (pandas.DataFrame, optional): A DataFrame containing difference features. Defaults to None.
+    Returns:
+
+    final_data (pandas.DataFrame): The assembled feature matrix.
+    """
+    final_data = merge_data(data, lagged_data, derived_data, diff_data)
+    if not isStationary_adf:
+        target_list = [x for x in final_data.columns.tolist() if x.startswith(target) and x != target]
+        final_data = trend_removal_log(final_data, target_list)
+    return final_data
 
 
 def split(df,target,horizon,len_unique):
@@ -522,6 +832,86 @@ def split(df,target,horizon,len_unique):
     y = y.iloc[horizon*len_unique - horizon:]
     return X,y
 
+def assemble_matrix(data, feature_blocks, target, isStationary_adf, horizon, unique_len, dtype='float32'):
+    """
+    This function assembles the features and horizon targets the way build_final_data followed by split does, without
+    the chained merges. The blocks are aligned on their shared index and every numeric feature column is written once
+    into a single preallocated C-contiguous matrix of the given dtype, which X wraps without a copy: row slices of X
+    (e.g. folds) are views. Non-numeric columns (date parts to be one-hot encoded) are inserted next to it at their
+    original positions, and the target keeps its own dtype. preprocessor_build encodes them as float32, so the matrices
+    the boosters receive keep the dtype of this matrix whatever the date encoding.
+
+    Parameters:
+
+    data (pandas.DataFrame): The primary DataFrame holding the target, as passed to build_final_data.
+    feature_blocks (list): The lagged, derived and difference feature DataFrames; None entries are skipped.
+    target (str): The name of the target variable.
+    isStationary_adf (bool): The result of the ADF test on the target; target-derived columns are log-transformed if
+     False.
+    horizon (int): The prediction horizon, indicating the number of time steps ahead to predict.
+    unique_len (int): The number of series in the panel.
+    dtype (str, optional): The dtype of the feature matrix. Defaults to 'float32'.
+    Returns:
+
+    X (pandas.DataFrame): The features DataFrame over the contiguous matrix.
+    y (pandas.DataFrame): The target variable DataFrame.
+    """
+    frames = [data] + [x for x in feature_blocks if x is not None]
+    index = data.index
+    for frame in frames[1:]:
+        if not frame.index.equals(index):
+            index = index[index.isin(frame.index)]
+    frames = [x if x.index.equals(index) else x.reindex(index) for x in frames]
+    start = int(horizon) * int(unique_len)
+    columns, numeric = [], []
+    for frame in frames:
+        for column in frame.columns:
+            if column != target:
+                columns.append(column)
+                if pd.api.types.is_numeric_dtype(frame[column]):
+                    numeric.append(column)
+    matrix = np.empty((len(index) - start, len(numeric)), dtype=dtype)
+    position = 0
+    for frame in frames:
+        frame_numeric = [x for x in frame.columns if x != target and pd.api.types.is_numeric_dtype(frame[x])]
+        rows = frame.iloc[start:]
+        if len(frame_numeric) != rows.shape[1]:
+            rows = rows[frame_numeric]
+        matrix[:, position:position + len(frame_numeric)] = rows.to_numpy(dtype=dtype)
+        position += len(frame_numeric)
+    if not isStationary_adf:
+        log_positions = [i for i, x in enumerate(numeric) if x.startswith(target)]
+        matrix[:, log_positions] = signed_apply(matrix[:, log_positions], np.log1p)
+        rename = {x: f"{x}_log" for x in numeric if x.startswith(target)}
+        numeric = [rename.get(x, x) for x in numeric]
+        columns = [rename.get(x, x) for x in columns]
+    X = pd.DataFrame(matrix, index=index[start:], columns=numeric, copy=False)
+    for frame in frames:
+        for column in frame.columns:
+            if column != target and not pd.api.types.is_numeric_dtype(frame[column]):
+                X.insert(columns.index(column), column, frame[column].to_numpy()[start:])
+    _, y = split(frames[0][[target]], target, horizon, unique_len)
+    return X, y
+
+
+def fold_indexer(indices):
+    """
+    This function turns fold indices into a slice when they form a contiguous ascending range, as get_fold produces, so
+    that .iloc returns a view of the rows instead of a copy.
+
+    Parameters:
+
+    indices (list): The positional row indices of a fold.
+    Returns:
+
+    indexer (slice or list): A slice over the same rows, or the indices themselves when they are not contiguous.
+    """
+    if len(indices) and indices[-1] - indices[0] == len(indices) - 1 and \
+            np.all(np.diff(np.asarray(indices)) == 1):
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+    return indices
+
+
 def split_data(data,window,unique_len):
     """
     This function splits a DataFrame based on the specified window size and length of unique elements.
@@ -543,18 +933,23 @@ def split_data(data,window,unique_len):
         data = data.sort_index()
     return data
 
-def get_fold(X,fold_number,unique_len):
+def get_fold(X,fold_number,unique_len,early_stopping_fraction=0.0):
     """
     This function generates cross-validation partitions for time series data based on the specified fold number and length of unique elements.
+    With early_stopping_fraction, the tail of each train partition is held out as its early-stopping set, so the
+    validation partition is only used for scoring.
 
     Parameters:
 
     X (pandas.DataFrame): The DataFrame containing the features for which cross-validation partitions will be generated.
     fold_number (int): The number of folds for cross-validation.
     unique_len (int): The length of unique elements or patterns in the time series data.
+    early_stopping_fraction (float): The share of each train partition held out for early stopping, rounded down to
+    whole dates (at least one). Defaults to 0.0, which holds out nothing.
     Returns:
 
-    cv_partitions (list): A list of dictionaries representing train-validation index pairs for each fold.
+    cv_partitions (list): A list of dictionaries representing train-validation index pairs for each fold, with the
+    'early_stopping' indices (empty without early_stopping_fraction).
     """
     X = X.reset_index()
     index = int(len(X)/(fold_number+1))
@@ -562,28 +957,41 @@ def get_fold(X,fold_number,unique_len):
         index -= 1
     cv_partitions = []
     for i in range(1,fold_number+1):
-        train_index = X.iloc[:index*i]
+        stop = 0
+        if early_stopping_fraction > 0:
+            stop = max(int(index*i*early_stopping_fraction) // unique_len, 1) * unique_len
+        train_index = X.iloc[:index*i-stop]
+        stop_index = X.iloc[index*i-stop:index*i]
         if i == fold_number:
             val_index = X.iloc[index*i:]
         else:
             val_index = X.iloc[index*i:index*(i+1)]
         cv_partitions.append({f'train': train_index.index.tolist(),
+                              f'early_stopping': stop_index.index.tolist(),
                               f'validation': val_index.index.tolist()})
     return cv_partitions
 
 
-def pipeline_build(alg,num_cols,cat_cols):
+MULTI_OUTPUT_STRATEGIES = {
+    'separate': MultiOutputRegressor,
+    'native': NativeMultiOutputRegressor,
+    'stacked': HorizonStackedRegressor
+}
+
+
+def preprocessor_build(num_cols,cat_cols):
     """
-   This function constructs a scikit-learn pipeline for preprocessing numeric and categorical features and applying a specified machine learning algorithm.
+   This function constructs the preprocessing step shared by every pipeline: median imputation of numeric features and
+   constant imputation plus one-hot encoding of categorical features. The one-hot columns are float32, so they do not
+   upcast a float32 feature matrix.
 
    Parameters:
 
-   alg (object): The machine learning algorithm to be used. It should be compatible with scikit-learn's estimator interface.
    num_cols (list): A list of column names representing numeric features.
    cat_cols (list): A list of column names representing categorical features.
    Returns:
 
-   pipe (Pipeline): A scikit-learn pipeline that preprocesses features and applies the specified machine learning algorithm.
+   preprocessor (ColumnTransformer): The unfitted preprocessing step.
    """
     numeric_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='median', fill_value='missing')),
@@ -591,13 +999,124 @@ def pipeline_build(alg,num_cols,cat_cols):
 
     categorical_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='constant')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))])
+        ('onehot', OneHotEncoder(handle_unknown='ignore', dtype=np.float32))])
 
     preprocessor = ColumnTransformer(
         transformers=[
             ('num', numeric_transformer, num_cols),
             ('cat', categorical_transformer, cat_cols)], remainder='passthrough')
+    return preprocessor
+
+
+def algorithm_build(alg, multi_output_strategy='separate', n_jobs=None):
+    """
+   This function wraps a regressor so that it predicts every horizon step.
 
-    pipe = Pipeline(steps=[('preprocessor', preprocessor),
-                               ('algorithm', MultiOutputRegressor(alg))])
+   Parameters:
+
+   alg (object): The machine learning algorithm to be used.
+   multi_output_strategy (str, optional): 'separate', 'native' or 'stacked' (see pipeline_build). Defaults to 'separate'.
+   n_jobs (int, optional): The number of horizon models fitted concurrently by the 'separate' strategy. Defaults to None.
+   Returns:
+
+   algorithm (object): The multi-output regressor.
+   """
+    if multi_output_strategy == 'separate':
+        return MultiOutputRegressor(alg, n_jobs=n_jobs)
+    return MULTI_OUTPUT_STRATEGIES[multi_output_strategy](alg)
+
+
+def pipeline_build(alg,num_cols,cat_cols,multi_output_strategy='separate'):
+    """
+   This function constructs a scikit-learn pipeline for preprocessing numeric and categorical features and applying a specified machine learning algorithm.
+
+   Parameters:
+
+   alg (object): The machine learning algorithm to be used. It should be compatible with scikit-learn's estimator interface.
+   num_cols (list): A list of column names representing numeric features.
+   cat_cols (list): A list of column names representing categorical features.
+   multi_output_strategy (str, optional): How the horizon steps are learned: 'separate' fits one model per step,
+    'native' fits one model with the booster's multi-target objective and 'stacked' fits one model with the step as a
+    feature. Defaults to 'separate'.
+   Returns:
+
+   pipe (Pipeline): A scikit-learn pipeline that preprocesses features and applies the specified machine learning algorithm.
+   """
+    pipe = Pipeline(steps=[('preprocessor', preprocessor_build(num_cols, cat_cols)),
+                               ('algorithm', algorithm_build(alg, multi_output_strategy))])
     return pipe
+
+
+def fit_pipeline(pipe, X_train, y_train, X_val=None, y_val=None, early_stopping_rounds=None):
+    """
+    This function fits a pipeline built by pipeline_build. When early stopping rounds and a validation slice are given, every
+    horizon model is fitted on the preprocessed data with early stopping against its own validation column.
+
+    Parameters:
+
+    pipe (Pipeline): The pipeline returned by pipeline_build.
+    X_train (pandas.DataFrame): The training features.
+    y_train (pandas.DataFrame): The training target with one column per horizon step.
+    X_val (pandas.DataFrame, optional): The validation features. Defaults to None.
+    y_val (pandas.DataFrame, optional): The validation target. Defaults to None.
+    early_stopping_rounds (int, optional): The number of rounds without improvement before stopping. Defaults to None.
+    Returns:
+
+    pipe (Pipeline): The fitted pipeline.
+    """
+    if not early_stopping_rounds or X_val is None:
+        return pipe.fit(X_train, y_train)
+    preprocessor = pipe.named_steps['preprocessor']
+    X_train_t = preprocessor.fit_transform(X_train)
+    X_val_t = preprocessor.transform(X_val)
+    fit_algorithm(pipe.named_steps['algorithm'], X_train_t, y_train, X_val_t, y_val, early_stopping_rounds)
+    return pipe
+
+
+def fit_algorithm(algorithm, X_train, y_train, X_val=None, y_val=None, early_stopping_rounds=None):
+    """
+    This function fits a multi-output regressor built by algorithm_build on already preprocessed data. When early stopping
+    rounds and an early-stopping slice are given, every horizon model stops against its own column of that slice. The
+    slice must not be the one the model is scored on (get_fold holds it out of the train partition).
+
+    Parameters:
+
+    algorithm (object): The regressor returned by algorithm_build.
+    X_train (array-like): The preprocessed training features.
+    y_train (pandas.DataFrame): The training target with one column per horizon step.
+    X_val (array-like, optional): The preprocessed early-stopping features. Defaults to None.
+    y_val (pandas.DataFrame, optional): The early-stopping target. Defaults to None.
+    early_stopping_rounds (int, optional): The number of rounds without improvement before stopping. Defaults to None.
+    Returns:
+
+    algorithm (object): The fitted regressor.
+    """
+    if not early_stopping_rounds or X_val is None:
+        return algorithm.fit(X_train, y_train)
+    if not isinstance(algorithm, MultiOutputRegressor):
+        return algorithm.fit(X_train, y_train, X_val, y_val, early_stopping_rounds)
+    algorithm.estimators_ = Parallel(n_jobs=algorithm.n_jobs)(
+        delayed(fit_early_stopped)(clone(algorithm.estimator), X_train, y_train.iloc[:, k], X_val, y_val.iloc[:, k],
+                                   early_stopping_rounds)
+        for k in range(y_train.shape[1]))
+    return algorithm
+
+
+def fit_early_stopped(estimator, X_train, y_train, X_val, y_val, early_stopping_rounds):
+    """
+    This function fits a single horizon model with early stopping against its validation column.
+
+    Parameters:
+
+    estimator (object): The unfitted booster.
+    X_train (array-like): The preprocessed training features.
+    y_train (pandas.Series): The training target of one horizon step.
+    X_val (array-like): The preprocessed validation features.
+    y_val (pandas.Series): The validation target of the same horizon step.
+    early_stopping_rounds (int): The number of rounds without improvement before stopping.
+    Returns:
+
+    estimator (object): The fitted booster.
+    """
+    fit_params = early_stopping_fit_params(estimator, X_val, y_val, early_stopping_rounds)
+    return estimator.fit(X_train, y_train, **fit_params)
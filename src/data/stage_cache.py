@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from pympler.asizeof import asizeof
+from src.data.feature_store import file_hash
+
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a cached value in bytes.
+
+    Parameters:
+    - value: The cached value (DataFrame, Series, array, string, container or any other object).
+
+    Returns:
+    - int: The estimated size in bytes.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(x) for x in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(x) for x in value.values())
+    return asizeof(value)
+
+
+class StageCache:
+    def __init__(self, max_bytes):
+        """
+        Initialize the StageCache class.
+
+        The cache keeps stage results in memory, keyed on the hash of the input data and the stage parameters, and evicts
+        the least recently used results once their total estimated size exceeds max_bytes.
+
+        Parameters:
+        - max_bytes (int): Memory bound of the cache in bytes.
+
+        Returns:
+        - None
+        """
+        self.cache = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: entry[1])
+        self.file_hashes = {}
+
+    def data_hash(self, file):
+        """
+        Return the content hash of a data file, re-hashing it only when its size or modification time changes.
+
+        Parameters:
+        - file (str): The path of the data file.
+
+        Returns:
+        - str: The hexadecimal digest of the file content.
+        """
+        stat = os.stat(file)
+        signature = (file, stat.st_size, stat.st_mtime_ns)
+        if signature not in self.file_hashes:
+            self.file_hashes[signature] = file_hash(file)
+        return self.file_hashes[signature]
+
+    def get_or_compute(self, stage, data_hash, params, func, *args, **kwargs):
+        """
+        Return the cached result of a stage, computing and caching it on a miss.
+        Results larger than the memory bound are returned without being cached.
+
+        Parameters:
+        - stage (str): The stage name.
+        - data_hash (str): Hash of the input data.
+        - params (dict): The parameters the stage result depends on.
+        - func (callable): The function computing the stage result from *args and **kwargs.
+
+        Returns:
+        - The stage result.
+        """
+        key = hashlib.sha256(json.dumps({'stage': stage, 'data': data_hash, 'params': params},
+                                        sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        entry = self.cache.get(key)
+        if entry is None:
+            value = func(*args, **kwargs)
+            entry = (value, estimate_size(value))
+            if entry[1] <= self.cache.maxsize:
+                self.cache[key] = entry
+        return entry[0]
+
+    def clear(self):
+        """
+        Drop every cached stage result.
+
+        Returns:
+        - None
+        """
+        self.cache.clear()
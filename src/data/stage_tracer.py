@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager, ExitStack
+import pandas as pd
+import psutil
+
+
+def rss_mb():
+    """
+    Return the current resident set size of the process in megabytes.
+
+    Returns:
+    - float: The current RSS.
+    """
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+
+class RssSampler:
+    def __init__(self, interval=0.01):
+        """
+        Initialize the RssSampler class.
+
+        While running, a daemon thread samples the RSS of the process every interval seconds, so the peak reached inside
+        one stage is measured on its own rather than taken from the lifetime peak of the process.
+
+        Parameters:
+        - interval (float, optional): Seconds between two samples. Defaults to 0.01.
+
+        Returns:
+        - None
+        """
+        self.interval = interval
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.end_mb = rss_mb()
+        self.peak_mb = max(self.peak_mb, self.end_mb)
+        return False
+
+
+class StageTracer:
+    def __init__(self, enabled=True, memory=None, rss_interval=0.01):
+        """
+        Initialize the StageTracer class.
+
+        Every stage run inside stage() records its wall time, CPU time, the peak RSS sampled while it ran, the RSS it
+        left behind (the change from its start to its end) and, through add_frame(), the rows and columns it produced.
+
+        Parameters:
+        - enabled (bool): If False, stage() only runs the wrapped block and nothing is recorded.
+        - memory (MemoryReport, optional): A memory report every stage is also traced with.
+        - rss_interval (float, optional): Seconds between two RSS samples while a stage runs. Defaults to 0.01.
+
+        Returns:
+        - None
+        """
+        self.enabled = enabled
+        self.memory = memory
+        self.rss_interval = rss_interval
+        self.rows = []
+
+    @contextmanager
+    def stage(self, name, memory=True):
+        """
+        Trace the wrapped block.
+
+        Parameters:
+        - name (str): The stage name.
+        - memory (bool, optional): Whether the memory report also traces the stage; tracemalloc slows pure-Python code
+          down considerably, so long-running stages can opt out. Defaults to True.
+
+        Yields:
+        - dict: The row of the stage; the frame it produced can be attached with add_frame().
+        """
+        with ExitStack() as stack:
+            memory_row = stack.enter_context(self.memory.stage(name)) if self.memory is not None and memory else None
+            row = {'stage': name, '_memory_row': memory_row}
+            if not self.enabled:
+                yield row
+                return
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                with RssSampler(self.rss_interval) as rss:
+                    yield row
+            finally:
+                row.update({'wall_s': time.perf_counter() - wall, 'cpu_s': time.process_time() - cpu,
+                            'peak_rss_mb': rss.peak_mb, 'rss_delta_mb': rss.end_mb - rss.start_mb})
+                self.rows.append(row)
+
+    def add_frame(self, row, data):
+        """
+        Attach the shape of the frame a stage produced to its row.
+
+        Parameters:
+        - row (dict): The row yielded by stage().
+        - data (pd.DataFrame or tuple): The frame produced by the stage; for tuples (e.g. X, y) the first frame is used.
+
+        Returns:
+        - The data itself.
+        """
+        frame = data[0] if isinstance(data, tuple) else data
+        if row.get('_memory_row') is not None:
+            self.memory.add_frame(row['_memory_row'], frame)
+        row.update({'rows': frame.shape[0], 'cols': frame.shape[1] if frame.ndim > 1 else 1})
+        return data
+
+    def to_frame(self):
+        """
+        Return the recorded stages as a DataFrame.
+
+        Returns:
+        - pd.DataFrame: One row per stage with its wall time, CPU time, peak and retained RSS and shape.
+        """
+        return pd.DataFrame([{k: v for k, v in row.items() if k != '_memory_row'} for row in self.rows],
+                            columns=['stage', 'wall_s', 'cpu_s', 'peak_rss_mb', 'rss_delta_mb', 'rows', 'cols'])
+
+    def save(self, directory, metadata=None):
+        """
+        Write the trace as a JSON file.
+
+        Parameters:
+        - directory (str): The directory of the trace files.
+        - metadata (dict, optional): Run information stored with the trace (e.g. the model). Defaults to None.
+
+        Returns:
+        - str: The path of the written file.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        trace = {'created': time.time(), 'metadata': metadata or {},
+                 'stages': json.loads(self.to_frame().to_json(orient='records'))}
+        with open(path, 'w') as handle:
+            json.dump(trace, handle, indent=2)
+        return path
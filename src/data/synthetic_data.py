@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+
+def synthetic_panel(n_stores=45, n_weeks=143, start='2010-02-05', date_format='%d-%m-%Y', random_state=42):
+    """
+    Generate a synthetic panel shaped like the raw Walmart sales data (one row per store and week), for benchmarking the
+    pipeline at arbitrary sizes.
+
+    Parameters
+    ----------
+    n_stores : int, optional
+        The number of stores (series).
+    n_weeks : int, optional
+        The number of weekly timestamps per store.
+    start : str, optional
+        The first week.
+    date_format : str, optional
+        The format the Date column is written in, as in the raw CSV; None keeps it as datetime64.
+    random_state : int, optional
+        The random seed.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Store, Date, Weekly_Sales, Holiday_Flag, Temperature, Fuel_Price, CPI and Unemployment columns, sorted by store
+        and date like Walmart.csv.
+    """
+    rng = np.random.default_rng(random_state)
+    dates = pd.date_range(start, periods=n_weeks, freq='7D')
+    week = np.arange(n_weeks)
+    season = 2 * np.pi * dates.dayofyear.to_numpy() / 365.25
+    holiday = np.isin(dates.isocalendar().week.to_numpy(), [6, 36, 47, 52]).astype('int64')
+
+    level = rng.lognormal(13.7, 0.5, size=(n_stores, 1))
+    growth = rng.normal(0, 0.0005, size=(n_stores, 1))
+    sales = level * (1 + growth * week) * (1 + 0.1 * np.sin(season) + 0.15 * holiday) \
+        * rng.lognormal(0, 0.05, size=(n_stores, n_weeks))
+    temperature = 60 + 20 * rng.uniform(0.5, 1, size=(n_stores, 1)) * -np.cos(season) \
+        + rng.normal(0, 5, size=(n_stores, n_weeks))
+    fuel_price = 2.5 + 0.015 * week + rng.normal(0, 0.05, size=(n_stores, n_weeks)).cumsum(axis=1) * 0.1
+    cpi = rng.uniform(126, 215, size=(n_stores, 1)) * (1 + 0.0004 * week)
+    unemployment = rng.uniform(4, 14, size=(n_stores, 1)) - 0.005 * week + rng.normal(0, 0.05, size=(n_stores, n_weeks))
+
+    df = pd.DataFrame({
+        'Store': np.repeat(np.arange(1, n_stores + 1), n_weeks),
+        'Date': np.tile(dates.strftime(date_format) if date_format else dates, n_stores),
+        'Weekly_Sales': sales.ravel().round(2),
+        'Holiday_Flag': np.tile(holiday, n_stores),
+        'Temperature': temperature.ravel().round(2),
+        'Fuel_Price': fuel_price.ravel().round(3),
+        'CPI': cpi.ravel(),
+        'Unemployment': unemployment.ravel().round(3)
+    })
+    return df
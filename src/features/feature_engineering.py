@@ -1,4 +1,34 @@
-def date_engineering(data,col):
+import numpy as np
+
+DATE_FEATURES = {
+    'Day': ('day', 'int8', 31),
+    'Month': ('month', 'int8', 12),
+    'Year': ('year', 'int16', None),
+    'DayOfWeek': ('dayofweek', 'int8', 7),
+    'DayOfYear': ('dayofyear', 'int16', 366),
+    'WeekOfYear': ('weekofyear', 'int8', 53),
+    'Quarter': ('quarter', 'int8', 4)
+}
+
+
+def date_feature_names(cyclical=False):
+    """
+    This function lists the columns created by date_engineering.
+
+    Parameters:
+
+    cyclical (bool, optional): Whether the sine/cosine columns are included. Defaults to False.
+    Returns:
+
+    names (list): The names of the date-related feature columns.
+    """
+    names = list(DATE_FEATURES)
+    if cyclical:
+        names += [f'{name}_{fn}' for name, (_, _, period) in DATE_FEATURES.items() if period for fn in ('sin', 'cos')]
+    return names
+
+
+def date_engineering(data,col,encoding='onehot',cyclical=False):
     """
     This function performs feature engineering on a datetime column in a DataFrame, extracting various date-related features.
 
@@ -6,15 +36,24 @@ def date_engineering(data,col):
 
     data (pandas.DataFrame): The DataFrame containing the datetime column.
     col (str): The name of the datetime column for feature engineering.
+    encoding (str, optional): 'onehot' stores the date parts as strings so that the pipeline one-hot encodes them;
+     'ordinal' stores them as small integers that the boosters split on directly. Ordinal parts are deliberately numeric,
+     not categorical: they pass through the numeric branch of the pipeline, so the boosters split them on thresholds
+     (e.g. Month <= 6), which suits ordered date parts; use 'onehot' to treat each value as its own category.
+     Defaults to 'onehot'.
+    cyclical (bool, optional): If True, sine/cosine encodings of the periodic date parts are added as float32 columns.
+     Defaults to False.
     Returns:
 
     data (pandas.DataFrame): The DataFrame with additional date-related features.
     """
-    data['Day'] = data[col].dt.day.astype(str)
-    data['Month'] = data[col].dt.month.astype(str)
-    data['Year'] = data[col].dt.year.astype(str)
-    data['DayOfWeek'] = data[col].dt.dayofweek.astype(str)
-    data['DayOfYear'] = data[col].dt.dayofyear.astype(str)
-    data['WeekOfYear'] = data[col].dt.weekofyear.astype(str)
-    data['Quarter'] = data[col].dt.quarter.astype(str)
+    for name, (attribute, dtype, _) in DATE_FEATURES.items():
+        values = getattr(data[col].dt, attribute)
+        data[name] = values.astype(str) if encoding == 'onehot' else values.astype(dtype)
+    if cyclical:
+        for name, (attribute, _, period) in DATE_FEATURES.items():
+            if period:
+                angle = 2 * np.pi * getattr(data[col].dt, attribute).to_numpy(dtype='float32') / period
+                data[f'{name}_sin'] = np.sin(angle).astype('float32')
+                data[f'{name}_cos'] = np.cos(angle).astype('float32')
     return data
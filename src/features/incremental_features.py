@@ -0,0 +1,172 @@
+import warnings
+from collections import deque
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+from src.data.preprocess_data import editing_index, window_bounds, time_type_detect, ROLLING_FUNCTIONS
+
+WINDOW_FUNCTIONS = {
+    'min': np.nanmin,
+    'max': np.nanmax,
+    'mean': np.nanmean,
+    'std': lambda x: np.nanstd(x, ddof=1) if np.count_nonzero(~np.isnan(x)) > 1 else np.nan,
+    'median': np.nanmedian
+}
+
+
+class IncrementalFeatureBuilder:
+    def __init__(self, WINDOW, window_list, num_cols, time_type, frequency, series_id, datetime_feature, functions=None):
+        """
+        Initialize the IncrementalFeatureBuilder class.
+
+        The builder keeps, for every series, a bounded tail buffer of the last rows seen so that lag and rolling features for
+        newly arrived timestamps can be produced without rebuilding the whole history. The rows it emits match the ones
+        app_lag_data and app_derived_data would produce on the full panel.
+
+        Parameters:
+        - WINDOW (int): The window size used for lag and rolling feature derivation.
+        - window_list (list): A list of window sizes for rolling feature derivation.
+        - num_cols (list): List of numeric columns to derive features from.
+        - time_type (str): The type of time unit used for window sizes (e.g., 'weeks').
+        - frequency (int): The frequency of the data collection in the specified time unit.
+        - series_id (str): Name of the column containing unique identifiers for time series.
+        - datetime_feature (str): Name of the timestamp column in the data.
+        - functions (dict, optional): Rolling aggregations to compute. Defaults to ROLLING_FUNCTIONS.
+
+        Returns:
+        - None
+        """
+        self.start, self.lag_bound, self.span = window_bounds(WINDOW)
+        self.window_list = window_list
+        self.num_cols = num_cols
+        self.time_type = time_type
+        self.frequency = frequency
+        self.series_id = series_id
+        self.datetime_feature = datetime_feature
+        self.functions = ROLLING_FUNCTIONS if functions is None else functions
+        time_num = time_type_detect(time_type)
+        self.lag_columns = [f'{col}_lag_{lag}' for col in num_cols for lag in range(1, self.lag_bound + 1)]
+        self.derived_columns = [f'{col}_stat_{function_name}_{int(win * frequency / time_num)}_{time_type}'
+                                for win in window_list for function_name in self.functions for col in num_cols]
+        self.buffers = {}
+        self.positions = {}
+        self.last_timestamps = {}
+
+    def fit(self, data):
+        """
+        Seed the per-series tail buffers from the full history.
+
+        Parameters:
+        - data (pd.DataFrame): Historical data containing the timestamp, series identifier and numeric columns.
+
+        Returns:
+        - IncrementalFeatureBuilder: The fitted builder.
+        """
+        data = editing_index(data.reset_index(), self.datetime_feature, self.series_id)
+        self.buffers = {}
+        self.positions = {}
+        self.last_timestamps = {}
+        for seri, group in data.groupby(level=self.series_id, sort=False):
+            values = group[self.num_cols].to_numpy(dtype='float64')
+            self.buffers[seri] = deque(values[-self.span:], maxlen=self.span)
+            self.positions[seri] = len(values)
+            self.last_timestamps[seri] = group.index.get_level_values(self.datetime_feature)[-1]
+        return self
+
+    def _window_stat(self, function, values):
+        """
+        Apply one rolling aggregation to the raw values of a window, ignoring missing values like pandas rolling does.
+
+        Parameters:
+        - function (str or callable): The aggregation name from WINDOW_FUNCTIONS or a callable.
+        - values (np.ndarray): The window values of a single column.
+
+        Returns:
+        - float: The aggregated value.
+        """
+        if isinstance(function, str):
+            function = WINDOW_FUNCTIONS[function]
+        if np.isnan(values).all():
+            return np.nan
+        return function(values)
+
+    def _build_index(self, keys):
+        """
+        Build a (timestamp, series identifier) MultiIndex from a list of keys, including the empty case.
+
+        Parameters:
+        - keys (list): List of (timestamp, series identifier) tuples.
+
+        Returns:
+        - pd.MultiIndex: The index of the emitted feature rows.
+        """
+        return pd.MultiIndex.from_arrays([[key[0] for key in keys], [key[1] for key in keys]],
+                                         names=[self.datetime_feature, self.series_id])
+
+    def update(self, new_data):
+        """
+        Append newly arrived rows to the series buffers and derive their lag and rolling features.
+        Rows whose timestamp is not newer than the last one seen for their series are ignored.
+
+        Parameters:
+        - new_data (pd.DataFrame): New rows containing the timestamp, series identifier and numeric columns.
+
+        Returns:
+        - tuple: (lagged_data, derived_data) DataFrames indexed by (timestamp, series identifier) for the new rows.
+        """
+        new_data = editing_index(new_data.reset_index(), self.datetime_feature, self.series_id)
+        lag_rows, lag_index, derived_rows, derived_index = [], [], [], []
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            for (timestamp, seri), values in zip(new_data.index, new_data[self.num_cols].to_numpy(dtype='float64')):
+                if seri in self.last_timestamps and timestamp <= self.last_timestamps[seri]:
+                    continue
+                buffer = self.buffers.setdefault(seri, deque(maxlen=self.span))
+                buffer.append(values)
+                position = self.positions.get(seri, 0)
+                self.positions[seri] = position + 1
+                self.last_timestamps[seri] = timestamp
+                if position < self.start:
+                    continue
+                window = np.asarray(buffer)
+                lags = window[-1 - np.arange(1, self.lag_bound + 1)].T.ravel()
+                if not np.isnan(lags).any():
+                    lag_rows.append(lags)
+                    lag_index.append((timestamp, seri))
+                stats = []
+                for win in self.window_list:
+                    sub_window = window[-min(int(win), self.span):]
+                    for function in self.functions.values():
+                        stats.extend(self._window_stat(function, sub_window[:, j]) for j in range(len(self.num_cols)))
+                derived_rows.append(stats)
+                derived_index.append((timestamp, seri))
+        lagged_data = pd.DataFrame(lag_rows, columns=self.lag_columns, index=self._build_index(lag_index),
+                                   dtype='float64').sort_index()
+        derived_data = pd.DataFrame(derived_rows, columns=self.derived_columns, index=self._build_index(derived_index),
+                                    dtype='float64').sort_index()
+        return lagged_data, derived_data
+
+    def save(self, path):
+        """
+        Persist the builder state so the next refresh can continue from it.
+
+        Parameters:
+        - path (str): File path of the saved state.
+
+        Returns:
+        - None
+        """
+        dump(self, path, compress=('gzip', 3))
+
+    @staticmethod
+    def load(path):
+        """
+        Load a builder state saved with save.
+
+        Parameters:
+        - path (str): File path of the saved state.
+
+        Returns:
+        - IncrementalFeatureBuilder: The restored builder.
+        """
+        return load(path)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+SIGNED_TRANSFORMS = {
+    'log1p': np.log1p,
+    'sqrt': np.sqrt
+}
+
+
+def signed_apply(values, func):
+    """
+    Apply sign(x) * func(|x|) to an array.
+
+    Parameters:
+    - values (np.ndarray): The values to transform.
+    - func (np.ufunc): The transform applied to the absolute values (e.g. np.log1p).
+
+    Returns:
+    - np.ndarray: The transformed values, in a new array of the same dtype.
+    """
+    result = func(np.abs(values))
+    return np.multiply(result, np.sign(values), out=result)
+
+
+class SignedTransformer(BaseEstimator, TransformerMixin):
+    def __init__(self, method='log1p', columns=None, suffix='_log'):
+        """
+        Initialize the SignedTransformer class.
+
+        Applies sign(x) * f(|x|) column-wise with numpy ufuncs, so negative values keep their sign and the cost is linear in
+        the number of cells. DataFrames are rebuilt once from their columns rather than assigned column by column, which
+        would split and copy their blocks for every column.
+
+        Parameters:
+        - method (str, optional): The key of SIGNED_TRANSFORMS: 'log1p' or 'sqrt'. Defaults to 'log1p'.
+        - columns (list, optional): The DataFrame columns to transform. Defaults to None, which transforms every column.
+        - suffix (str, optional): Appended to the names of the transformed DataFrame columns. Defaults to '_log'.
+
+        Returns:
+        - None
+        """
+        self.method = method
+        self.columns = columns
+        self.suffix = suffix
+
+    def fit(self, X, y=None):
+        """
+        Record the transformed columns and their output names.
+
+        Parameters:
+        - X (pd.DataFrame or array-like): The data the transformer is fitted on.
+        - y (None): Ignored.
+
+        Returns:
+        - SignedTransformer: The fitted transformer.
+        """
+        if self.method not in SIGNED_TRANSFORMS:
+            raise ValueError(f'Unknown method {self.method!r}, expected one of {list(SIGNED_TRANSFORMS)}')
+        if isinstance(X, pd.DataFrame):
+            self.columns_ = list(X.columns) if self.columns is None else list(self.columns)
+        else:
+            self.columns_ = None
+        self.feature_names_out_ = None if self.columns_ is None else [f'{x}{self.suffix}' for x in self.columns_]
+        return self
+
+    def transform(self, X):
+        """
+        Apply the signed transform.
+
+        Parameters:
+        - X (pd.DataFrame or array-like): The data to transform.
+
+        Returns:
+        - pd.DataFrame or np.ndarray: The transformed data; DataFrame columns are renamed with the suffix.
+        """
+        func = SIGNED_TRANSFORMS[self.method]
+        if not isinstance(X, pd.DataFrame):
+            return signed_apply(np.asarray(X), func)
+        rename = dict(zip(self.columns_ or [], self.feature_names_out_ or []))
+        data = {rename.get(x, x): signed_apply(X[x].to_numpy(), func) if x in rename else X[x].to_numpy()
+                for x in X.columns}
+        return pd.DataFrame(data, index=X.index)
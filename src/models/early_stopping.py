@@ -0,0 +1,24 @@
+def early_stopping_fit_params(alg, X_val, y_val, early_stopping_rounds):
+    """
+    This function builds the fit arguments that make a booster stop adding trees once its validation score stops improving.
+
+    Parameters:
+
+    alg (object): The XGBRegressor, LGBMRegressor or CatBoostRegressor instance to be fitted. XGBRegressor receives the
+     number of rounds through set_params.
+    X_val (array-like): The preprocessed validation features.
+    y_val (array-like): The validation target (a single horizon step, or every step for multi-output objectives).
+    early_stopping_rounds (int): The number of rounds without improvement before stopping.
+    Returns:
+
+    fit_params (dict): The keyword arguments to pass to alg.fit.
+    """
+    if type(alg).__name__ == 'XGBRegressor':
+        alg.set_params(early_stopping_rounds=early_stopping_rounds)
+        return {'eval_set': [(X_val, y_val)], 'verbose': False}
+    elif type(alg).__name__ == 'LGBMRegressor':
+        from lightgbm import early_stopping
+        return {'eval_set': [(X_val, y_val)], 'callbacks': [early_stopping(early_stopping_rounds, verbose=False)]}
+    elif type(alg).__name__ == 'CatBoostRegressor':
+        return {'eval_set': (X_val, y_val), 'early_stopping_rounds': early_stopping_rounds, 'verbose': False}
+    return {}
@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from sklearn.pipeline import Pipeline
+from src.data.preprocess_data import preprocessor_build, fold_indexer
+
+
+class FoldMatrixCache:
+    def __init__(self, X, y, fold_list, num_cols, cat_cols, max_folds=None):
+        """
+        Initialize the FoldMatrixCache class.
+
+        The fold indices do not change between Optuna trials, so the preprocessing step is fitted once per fold and the
+        transformed train/early-stopping/validation matrices are reused by every trial and by the Trainer. Contiguous
+        folds are sliced as row views of X and y, so only the preprocessing step copies them. With max_folds, only the
+        matrices of the most recently used folds are kept (e.g. one for a memory-mapped X); the fitted preprocessing
+        steps are always kept, so an evicted fold is only transformed again. Lookups are guarded by a lock, so threaded fold workers can share the
+        cache.
+
+        Parameters:
+        - X (pd.DataFrame): Feature data.
+        - y (pd.DataFrame): Target data.
+        - fold_list (list): List of dictionaries containing training and validation indices for each fold.
+        - num_cols (list): List of numeric feature columns.
+        - cat_cols (list): List of categorical feature columns.
+        - max_folds (int, optional): The number of folds whose matrices are kept in memory. Defaults to None, which keeps
+          every fold.
+
+        Returns:
+        - None
+        """
+        self.X = X
+        self.y = y
+        self.fold_list = fold_list
+        self.num_cols = num_cols
+        self.cat_cols = cat_cols
+        self.max_folds = max_folds
+        self.preprocessors = {}
+        self.folds = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get(self, i):
+        """
+        Return the preprocessed matrices of a fold, fitting the preprocessing step on its first use.
+
+        Parameters:
+        - i (int): The fold number.
+
+        Returns:
+        - dict: The fitted 'preprocessor', the transformed 'X_train', 'X_stop' and 'X_val' matrices and the 'y_train',
+          'y_stop' and 'y_val' targets. 'X_stop' and 'y_stop' hold the early-stopping rows of the fold and are None when
+          it has none.
+        """
+        with self.lock:
+            fold = self.folds.pop(i, None)
+            if fold is None:
+                train_indices = fold_indexer(self.fold_list[i]['train'])
+                stop_rows = self.fold_list[i].get('early_stopping', [])
+                stop_indices = fold_indexer(stop_rows)
+                val_indices = fold_indexer(self.fold_list[i]['validation'])
+                preprocessor = self.preprocessors.get(i)
+                if preprocessor is None:
+                    preprocessor = preprocessor_build(self.num_cols, self.cat_cols)
+                    X_train = preprocessor.fit_transform(self.X.iloc[train_indices])
+                    self.preprocessors[i] = preprocessor
+                else:
+                    X_train = preprocessor.transform(self.X.iloc[train_indices])
+                fold = {
+                    'preprocessor': preprocessor,
+                    'X_train': X_train,
+                    'y_train': self.y.iloc[train_indices],
+                    'X_stop': preprocessor.transform(self.X.iloc[stop_indices]) if len(stop_rows) else None,
+                    'y_stop': self.y.iloc[stop_indices] if len(stop_rows) else None,
+                    'X_val': preprocessor.transform(self.X.iloc[val_indices]),
+                    'y_val': self.y.iloc[val_indices]
+                }
+            self.folds[i] = fold
+            while self.max_folds is not None and len(self.folds) > self.max_folds:
+                self.folds.popitem(last=False)
+            return fold
+
+    def fit_all(self):
+        """
+        Fit the preprocessing step of every fold up front, e.g. before the cache is shipped to worker processes. With
+        max_folds, only the last max_folds folds are transformed and cached; the other folds only get their preprocessing
+        step fitted, so the bound holds while fitting.
+
+        Returns:
+        - FoldMatrixCache: The cache itself.
+        """
+        n_cached = len(self.fold_list) if self.max_folds is None else min(self.max_folds, len(self.fold_list))
+        for i in range(len(self.fold_list) - n_cached):
+            with self.lock:
+                if i not in self.preprocessors:
+                    train_indices = fold_indexer(self.fold_list[i]['train'])
+                    self.preprocessors[i] = preprocessor_build(self.num_cols, self.cat_cols).fit(
+                        self.X.iloc[train_indices])
+        for i in range(len(self.fold_list) - n_cached, len(self.fold_list)):
+            self.get(i)
+        return self
+
+    def pipeline(self, i, algorithm):
+        """
+        Assemble a fitted pipeline from the cached preprocessing step of a fold and an algorithm fitted on its matrices.
+
+        Parameters:
+        - i (int): The fold number.
+        - algorithm (object): The fitted multi-output regressor.
+
+        Returns:
+        - Pipeline: A pipeline equivalent to a fitted pipeline_build pipeline.
+        """
+        if i not in self.preprocessors:
+            self.get(i)
+        return Pipeline(steps=[('preprocessor', self.preprocessors[i]), ('algorithm', algorithm)])
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import time
+import numpy as np
+import pandas as pd
+from joblib import load
+from src.data.preprocess_data import window_bounds, app_diff_data, build_final_data
+from src.features.incremental_features import IncrementalFeatureBuilder
+
+
+def load_pipelines(saved_model_path, model_name, folds=None, registry=None, mmap=False):
+    """
+    Load the fitted fold pipelines of a model. Folds registered in the model registry are returned as lazily loaded
+    native boosters; otherwise the pipelines saved by the Trainer under <saved_model_path>/<model_name>/<fold>.gz are
+    unpickled.
+
+    Parameters:
+    - saved_model_path (str): Path the trained models were saved to.
+    - model_name (str): Name of the model directory (e.g. 'XGBRegressor').
+    - folds (list, optional): Fold numbers to load. Defaults to None, which loads every saved fold.
+    - registry (ModelRegistry, optional): The registry checked first. Defaults to None.
+    - mmap (bool, optional): Memory-map the preprocessing state of registered folds. Defaults to False.
+
+    Returns:
+    - list: The fitted pipelines, ordered by fold number.
+    """
+    if registry is not None and registry.has(model_name):
+        return registry.load(model_name, folds, mmap)
+    directory = os.path.join(saved_model_path, model_name)
+    saved = sorted(int(m.group(1)) for m in (re.fullmatch(r'(\d+)\.gz', x) for x in os.listdir(directory)) if m)
+    if folds is not None:
+        saved = [x for x in saved if x in folds]
+    if not saved:
+        raise FileNotFoundError(f'No fitted pipeline found in {directory}')
+    return [load(os.path.join(directory, f'{i}.gz')) for i in saved]
+
+
+def load_feature_metadata(saved_model_path, model_name, registry=None):
+    """
+    Read the feature settings a model was trained with: the ADF/KPSS decisions, the date encoding and the feature
+    columns the fitted pipelines expect. They come from the registry entry of the model if it is registered, otherwise
+    from <saved_model_path>/<model_name>/features.json written by the Trainer.
+
+    Parameters:
+    - saved_model_path (str): Path the trained models were saved to.
+    - model_name (str): Name of the model directory (e.g. 'XGBRegressor').
+    - registry (ModelRegistry, optional): The registry checked first. Defaults to None.
+
+    Returns:
+    - dict or None: The feature settings, or None for models trained before they were saved.
+    """
+    if registry is not None and registry.has(model_name):
+        entries = registry.index()[model_name]
+        return entries[min(entries, key=int)]['metadata'].get('features')
+    path = os.path.join(saved_model_path, model_name, 'features.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def latest_window(data, WINDOW, series_id):
+    """
+    Keep the most recent rows of every series that the lag and derived features of its last timestamp depend on.
+
+    Parameters:
+    - data (pd.DataFrame): The panel indexed by (timestamp, series_id).
+    - WINDOW (int): The window size used for feature derivation.
+    - series_id (str): The name of the index level representing the series identifier.
+
+    Returns:
+    - pd.DataFrame: The tail of every series, start + 1 rows long (see window_bounds).
+    """
+    start, _, _ = window_bounds(WINDOW)
+    return data.groupby(level=series_id, sort=False).tail(start + 1).sort_index()
+
+
+def latest_features(data, WINDOW, window_list, num_cols, time_type, frequency, series_id, datetime_feature, target,
+                    isStationary_adf, dtype='float64', isStationary_kpss=True):
+    """
+    Build the feature row of the last timestamp of every series. An IncrementalFeatureBuilder is seeded with the latest
+    window of every series before its last timestamp and updated with the last rows, so only the newest row of every
+    series gets its lag and rolling features derived.
+
+    Parameters:
+    - data (pd.DataFrame): The date-engineered panel indexed by (timestamp, series_id), as used for training.
+    - WINDOW (int): The window size used for feature derivation.
+    - window_list (list): The rolling window sizes of the derived features.
+    - num_cols (list): The columns lag and derived features are built from.
+    - time_type (str): The time unit detected by frequency_detect.
+    - frequency (int): The frequency detected by frequency_detect.
+    - series_id (str): The name of the index level representing the series identifier.
+    - datetime_feature (str): The name of the timestamp index level.
+    - target (str): Name of the target variable.
+    - isStationary_adf (bool): The ADF test result the models were trained with.
+    - dtype (str, optional): The dtype of the lag, derived and difference features. Defaults to 'float64'.
+    - isStationary_kpss (bool, optional): The KPSS test result the models were trained with; diff features are added
+      when False. Defaults to True.
+
+    Returns:
+    - pd.DataFrame: One feature row per series, indexed by (timestamp, series_id), without the target column.
+    """
+    window = latest_window(data, WINDOW, series_id)
+    last = (window.groupby(level=series_id, sort=False).cumcount(ascending=False) == 0).values
+    builder = IncrementalFeatureBuilder(WINDOW, window_list, num_cols, time_type, frequency, series_id,
+                                        datetime_feature).fit(window[~last])
+    lagged_data, derived_data = builder.update(window[last])
+    lagged_data, derived_data = lagged_data.astype(dtype, copy=False), derived_data.astype(dtype, copy=False)
+    diff_data = None
+    if not isStationary_kpss:
+        diff_data = app_diff_data(window.loc[lagged_data.index], WINDOW, lagged_data, derived_data, target, time_type,
+                                  dtype=dtype)
+    final_data = build_final_data(window, lagged_data, derived_data, target, isStationary_adf, diff_data)
+    return final_data.drop([target], axis=1)
+
+
+class BatchForecaster:
+    def __init__(self, pipelines, horizon):
+        """
+        Initialize the BatchForecaster class.
+
+        The forecast of a series is the mean of the predictions of the given fold pipelines.
+
+        Parameters:
+        - pipelines (list): Fitted pipelines (see load_pipelines).
+        - horizon (int): Number of time steps every pipeline predicts.
+
+        Returns:
+        - None
+        """
+        self.pipelines = pipelines
+        self.horizon = horizon
+        self.columns = [f'+{i + 1}_Horizon_time_step' for i in range(horizon)]
+
+    def predict(self, X):
+        """
+        Forecast +1..+H for every row of X in a single call per pipeline.
+
+        Parameters:
+        - X (pd.DataFrame): Feature rows, e.g. the output of latest_features.
+
+        Returns:
+        - pd.DataFrame: The forecasts, indexed like X, one column per horizon step.
+        """
+        y_pred = np.mean([np.asarray(pipe.predict(X)).reshape(len(X), self.horizon) for pipe in self.pipelines], axis=0)
+        return pd.DataFrame(y_pred, index=X.index, columns=self.columns)
+
+    def throughput(self, X, repeats=10):
+        """
+        Benchmark the batch prediction throughput on X.
+
+        Parameters:
+        - X (pd.DataFrame): Feature rows to forecast.
+        - repeats (int, optional): Number of timed predict calls. Defaults to 10.
+
+        Returns:
+        - dict: The number of rows, the mean seconds per call and the rows forecast per second.
+        """
+        self.predict(X)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            self.predict(X)
+        seconds = (time.perf_counter() - start) / repeats
+        return {'rows': len(X), 'seconds': seconds, 'rows_per_sec': len(X) / seconds}
@@ -1,10 +1,162 @@
+import os
+import json
+import uuid
+import hashlib
 import numpy as np
+from sklearn.base import clone
 from sklearn.metrics import mean_squared_error
 import optuna
-from src.data.preprocess_data import pipeline_build
+from joblib import Parallel, delayed, effective_n_jobs
+from src.data.preprocess_data import algorithm_build, fit_algorithm
+from src.models.fold_cache import FoldMatrixCache
+from src.models.thread_budget import split_thread_budget, limit_threads
 from paths import Path
 
-def optuna_optimize(X, y, fold_list, alg, num_cols, cat_cols):
+
+def objective(trial,fold_cache,alg,early_stopping_rounds=None,multi_output_strategy='separate'):
+    """
+   Evaluate a set of hyperparameters using Optuna for time series forecasting.
+   The estimator is cloned so that concurrent trials never share a fitted instance. The running mean RMSE is reported after
+   every fold so that the study pruner can stop hopeless trials early. The preprocessed fold matrices come from fold_cache,
+   so the preprocessing step is not refitted in every trial.
+
+   Parameters:
+   - trial (optuna.Trial): Optuna trial object for hyperparameter optimization.
+   - fold_cache (FoldMatrixCache): Preprocessed train/validation matrices of every fold.
+   - alg: Time series regression algorithm (e.g., CatBoostRegressor, XGBRegressor, LGBMRegressor).
+   - early_stopping_rounds (int, optional): Booster early stopping rounds against each fold's early-stopping slice.
+   - multi_output_strategy (str, optional): 'separate', 'native' or 'stacked' (see pipeline_build).
+
+   Returns:
+   - float: Mean RMSE (Root Mean Squared Error) across all folds for the given hyperparameters.
+   """
+    params = {
+        'learning_rate': trial.suggest_float('learning_rate', 0.05, 0.5, step=0.01),
+        'n_estimators': trial.suggest_int('n_estimators', 10, 3000, step=10),
+        'max_bin': trial.suggest_int('max_bin', 16, 2048, step=16),
+        'subsample': trial.suggest_float('subsample', 0.1, 1, step=0.1),
+        'max_depth': trial.suggest_int('max_depth', 6, 10),
+    }
+    if type(alg).__name__ == 'CatBoostRegressor':
+        params.update({
+            'colsample_bylevel': trial.suggest_float('colsample_bylevel', 0.1, 1, step=0.1),
+            'loss_function': 'RMSE',
+            'verbose': False,
+            'allow_writing_files': False
+        })
+    elif type(alg).__name__ == 'XGBRegressor':
+        params.update({
+            'colsample_bylevel': trial.suggest_float('colsample_bylevel', 0.1, 1, step=0.1),
+            'num_leaves': trial.suggest_int('num_leaves', 10, 30),
+            'verbosity': 0
+        })
+    elif type(alg).__name__ == 'LGBMRegressor':
+        params.update({
+            'colsample_bytree': trial.suggest_float('colsample_bytree', 0.1, 1, step=0.1),
+            'num_leaves': trial.suggest_int('num_leaves', 10, 30),
+            'verbosity': 0,
+        })
+    alg = clone(alg)
+    alg.set_params(**params)
+    liste = []
+    for i in range(len(fold_cache.fold_list)):
+        fold = fold_cache.get(i)
+        algorithm = algorithm_build(alg, multi_output_strategy)
+        fit_algorithm(algorithm, fold['X_train'], fold['y_train'], fold['X_stop'], fold['y_stop'],
+                      early_stopping_rounds)
+        y_pred = algorithm.predict(fold['X_val'])
+        y_val = fold['y_val']
+        rmse = np.sqrt(mean_squared_error(y_val, y_pred))
+        liste.append(rmse)
+        trial.report(np.mean(liste), i)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    print(f'RMSE : {np.mean(liste)}')
+    return np.mean(liste)
+
+
+def build_storage(storage_path):
+    """
+    Build the local Optuna storage shared by the tuning workers.
+
+    Args:
+        storage_path (str): Path of a SQLite database (.db/.sqlite) or of a journal file (any other extension).
+
+    Returns:
+        str or optuna.storages.JournalStorage: The storage passed to Optuna.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(storage_path)), exist_ok=True)
+    if storage_path.endswith(('.db', '.sqlite')):
+        return f'sqlite:///{storage_path}'
+    return optuna.storages.JournalStorage(optuna.storages.JournalFileStorage(storage_path))
+
+
+def build_study_name(alg, data_hash, params):
+    """
+    Build a deterministic study name from the model, the input data and the settings the tuning results depend on, so
+    that reruns on the same data resume one study in the shared storage instead of adding a new one every time.
+
+    Args:
+        alg: The time series model to be optimized.
+        data_hash (str): Hash of the input data file.
+        params (dict): The feature and tuning settings the trial scores depend on.
+
+    Returns:
+        str: The study name.
+    """
+    payload = json.dumps({'data': data_hash, 'params': params}, sort_keys=True, default=str)
+    key = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    return f'advanced_multiple_time_series_{type(alg).__name__}_{key}'
+
+
+def finished_trials(study):
+    """
+    Count the trials of a study that ran to completion or were pruned.
+
+    Args:
+        study (optuna.Study): The study.
+
+    Returns:
+        int: The number of finished trials.
+    """
+    return len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,
+                                                        optuna.trial.TrialState.PRUNED)))
+
+
+def build_pruner():
+    """
+    Build the pruner that stops trials whose running fold RMSE is worse than the median of previous trials.
+
+    Returns:
+        optuna.pruners.MedianPruner: The study pruner.
+    """
+    return optuna.pruners.MedianPruner(n_startup_trials=Path.pruner_startup_trials)
+
+
+def optimize_worker(storage_path, study_name, n_trials, fold_cache, alg, early_stopping_rounds=None,
+                    multi_output_strategy='separate'):
+    """
+    Run a share of the trials of a study stored in local storage, in its own process.
+
+    Args:
+        storage_path (str): Path of the local Optuna storage.
+        study_name (str): Name of the study to load.
+        n_trials (int): Number of trials this worker runs.
+        fold_cache (FoldMatrixCache): Preprocessed train/validation matrices of every fold.
+        alg: The time series model to be optimized.
+        early_stopping_rounds (int, optional): Booster early stopping rounds against each fold's early-stopping slice.
+        multi_output_strategy (str, optional): 'separate', 'native' or 'stacked' (see pipeline_build).
+
+    Returns:
+        None
+    """
+    study = optuna.load_study(study_name=study_name, storage=build_storage(storage_path), pruner=build_pruner())
+    study.optimize(lambda trial: objective(trial, fold_cache, alg, early_stopping_rounds, multi_output_strategy),
+                   n_trials=n_trials)
+
+
+def optuna_optimize(X, y, fold_list, alg, num_cols, cat_cols, n_jobs=1, storage_path=None, early_stopping_rounds=None,
+                    multi_output_strategy='separate', fold_cache=None, thread_budget=None, study_name=None):
     """
     Optuna-based hyperparameter optimization for time series models.
 
@@ -15,73 +167,48 @@ def optuna_optimize(X, y, fold_list, alg, num_cols, cat_cols):
         alg: The time series model to be optimized.
         num_cols (list): List of numeric columns in the feature matrix.
         cat_cols (list): List of categorical columns in the feature matrix.
+        n_jobs (int, optional): Number of worker processes running trials concurrently (-1 uses every core). Defaults to 1.
+        storage_path (str, optional): Local storage the workers coordinate through; required when n_jobs is not 1.
+        early_stopping_rounds (int, optional): Booster early stopping rounds against each fold's early-stopping slice.
+        multi_output_strategy (str, optional): 'separate', 'native' or 'stacked' (see pipeline_build).
+        fold_cache (FoldMatrixCache, optional): Preprocessed fold matrices to reuse; built from X, y and fold_list if None.
+        thread_budget (int, optional): Total number of booster threads shared by the workers; None uses every core.
+        study_name (str, optional): Name of the study in the shared storage (see build_study_name). An existing study is
+            resumed and only the missing trials are run. If None, a uniquely named study is created and deleted once its
+            best parameters are read.
 
     Returns:
         tuple: A tuple containing the best hyperparameters and the corresponding best value.
     """
     print("Model : ", type(alg).__name__)
-
-    def objective(trial,X,y,fold_list,alg,num_cols,cat_cols):
-        """
-       Evaluate a set of hyperparameters using Optuna for time series forecasting.
-
-       Parameters:
-       - trial (optuna.Trial): Optuna trial object for hyperparameter optimization.
-       - X (pd.DataFrame): Input features.
-       - y (pd.DataFrame): Target variable.
-       - fold_list (list): List of folds for time series cross-validation.
-       - alg: Time series regression algorithm (e.g., CatBoostRegressor, XGBRegressor, LGBMRegressor).
-       - num_cols (list): List of numerical columns.
-       - cat_cols (list): List of categorical columns.
-
-       Returns:
-       - float: Mean RMSE (Root Mean Squared Error) across all folds for the given hyperparameters.
-       """
-        params = {
-            'learning_rate': trial.suggest_float('learning_rate', 0.05, 0.5, step=0.01),
-            'n_estimators': trial.suggest_int('n_estimators', 10, 3000, step=10),
-            'max_bin': trial.suggest_int('max_bin', 16, 2048, step=16),
-            'subsample': trial.suggest_float('subsample', 0.1, 1, step=0.1),
-            'max_depth': trial.suggest_int('max_depth', 6, 10),
-        }
-        if type(alg).__name__ == 'CatBoostRegressor':
-            params.update({
-                'colsample_bylevel': trial.suggest_float('colsample_bylevel', 0.1, 1, step=0.1),
-                'loss_function': 'RMSE',
-                'verbose': False
-            })
-        elif type(alg).__name__ == 'XGBRegressor':
-            params.update({
-                'colsample_bylevel': trial.suggest_float('colsample_bylevel', 0.1, 1, step=0.1),
-                'num_leaves': trial.suggest_int('num_leaves', 10, 30),
-                'verbosity': 0
-            })
-        elif type(alg).__name__ == 'LGBMRegressor':
-            params.update({
-                'colsample_bytree': trial.suggest_float('colsample_bytree', 0.1, 1, step=0.1),
-                'num_leaves': trial.suggest_int('num_leaves', 10, 30),
-                'verbosity': 0,
-            })
-        liste = []
-        for i in range(len(fold_list)):
-            train_indices = fold_list[i]['train']
-            val_indices = fold_list[i]['validation']
-            X_train = X.iloc[train_indices]
-            y_train = y.iloc[train_indices]
-            X_val = X.iloc[val_indices]
-            y_val = y.iloc[val_indices]
-            alg.set_params(**params)
-            pipe = pipeline_build(alg, num_cols, cat_cols)
-            pipe.fit(X_train, y_train)
-            y_pred = pipe.predict(X_val)
-            rmse = np.sqrt(mean_squared_error(y_val, y_pred))
-            liste.append(rmse)
-        print(f'RMSE : {np.mean(liste)}')
-        return np.mean(liste)
-
-    study = optuna.create_study(direction='minimize', study_name='advanced_multiple_time_series')
-    study.optimize(lambda trial: objective(trial, X, y, fold_list, alg, num_cols, cat_cols),
-                   n_trials=Path.hyperparameter_trial_number)
-    print(f"Best Params : {study.best_params}",
-          f"Best Value : {study.best_value}")
-    return study.best_params, study.best_value
+    if fold_cache is None:
+        fold_cache = FoldMatrixCache(X, y, fold_list, num_cols, cat_cols)
+    n_workers = effective_n_jobs(n_jobs)
+    alg = limit_threads(alg, split_thread_budget(thread_budget, n_workers))
+    if n_workers == 1:
+        study = optuna.create_study(direction='minimize', study_name='advanced_multiple_time_series',
+                                    pruner=build_pruner())
+        study.optimize(lambda trial: objective(trial, fold_cache, alg, early_stopping_rounds, multi_output_strategy),
+                       n_trials=Path.hyperparameter_trial_number)
+    else:
+        temporary = study_name is None
+        if temporary:
+            study_name = f'advanced_multiple_time_series_{type(alg).__name__}_{uuid.uuid4().hex[:8]}'
+        storage = build_storage(storage_path)
+        study = optuna.create_study(direction='minimize', study_name=study_name, storage=storage,
+                                    pruner=build_pruner(), load_if_exists=True)
+        n_remaining = max(Path.hyperparameter_trial_number - finished_trials(study), 0)
+        trial_shares = [len(x) for x in np.array_split(np.arange(n_remaining), n_workers) if len(x)]
+        if trial_shares:
+            fold_cache.fit_all()
+            Parallel(n_jobs=len(trial_shares))(
+                delayed(optimize_worker)(storage_path, study_name, n_trials, fold_cache, alg, early_stopping_rounds,
+                                         multi_output_strategy)
+                for n_trials in trial_shares)
+        study = optuna.load_study(study_name=study_name, storage=storage)
+    best_params, best_value = study.best_params, study.best_value
+    if n_workers != 1 and temporary:
+        optuna.delete_study(study_name=study_name, storage=storage)
+    print(f"Best Params : {best_params}",
+          f"Best Value : {best_value}")
+    return best_params, best_value
@@ -14,10 +14,14 @@ def metrics_calculate(y_val,y_pred,X_train):
 
     Returns:
     - dict: Dictionary containing the calculated regression metrics (RMSE, MAE, RMSLE, R-Squared, Adj R-Squared, MAPE).
+      RMSLE is NaN when a target or prediction is negative, since the log error is undefined there.
     """
     rmse = np.sqrt(mean_squared_error(y_val, y_pred))
     mae = mean_absolute_error(y_val, y_pred)
-    rmsle = mean_squared_log_error(y_val, y_pred),
+    if (np.asarray(y_val) < 0).any() or (np.asarray(y_pred) < 0).any():
+        rmsle = np.nan,
+    else:
+        rmsle = mean_squared_log_error(y_val, y_pred),
     r2 = r2_score(y_val, y_pred),
     adj_r2 = 1 - (1 - (r2_score(y_val, y_pred))) * (X_train.shape[0] - 1) / (X_train.shape[0] - len(X_train.columns.tolist()) - 1)
     mape = mean_absolute_percentage_error(y_val, y_pred)
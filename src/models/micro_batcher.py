@@ -0,0 +1,145 @@
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+
+class LatencyStats:
+    def __init__(self, window=10000):
+        """
+        Initialize the LatencyStats class.
+
+        Parameters:
+        - window (int): Number of most recent request latencies kept for the percentiles.
+
+        Returns:
+        - None
+        """
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def record_batch(self, n_rows, latencies):
+        """
+        Record a predicted micro-batch and the latencies of the requests it served.
+
+        Parameters:
+        - n_rows (int): Number of rows predicted in the batch.
+        - latencies (list): Seconds between each request being queued and answered.
+
+        Returns:
+        - None
+        """
+        with self.lock:
+            self.batches += 1
+            self.rows += n_rows
+            self.requests += len(latencies)
+            self.latencies.extend(latencies)
+
+    def snapshot(self):
+        """
+        Return the current counters.
+
+        Returns:
+        - dict: Request/batch/row counts, mean batch size, throughput and p50/p99 latency in milliseconds.
+        """
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            elapsed = time.perf_counter() - self.started
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'rows': self.rows,
+                'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'requests_per_sec': self.requests / elapsed if elapsed else 0.0,
+                'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None
+            }
+
+
+class MicroBatcher:
+    def __init__(self, forecaster, max_batch_size=64, max_wait_ms=5):
+        """
+        Initialize the MicroBatcher class.
+
+        Requests queued by concurrent callers are gathered by a single worker thread into one DataFrame, predicted with a
+        single forecaster.predict call and answered through their futures. A batch is flushed once it holds
+        max_batch_size requests or its oldest request has waited max_wait_ms.
+
+        Parameters:
+        - forecaster (BatchForecaster): The forecaster of one model.
+        - max_batch_size (int): Maximum number of requests per predict call.
+        - max_wait_ms (float): Maximum time the first request of a batch waits for others.
+
+        Returns:
+        - None
+        """
+        self.forecaster = forecaster
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.stats = LatencyStats()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, X):
+        """
+        Queue feature rows to be forecast in the next micro-batch.
+
+        Parameters:
+        - X (pd.DataFrame): The feature rows of the request.
+
+        Returns:
+        - concurrent.futures.Future: Resolves to the forecasts of the rows.
+        """
+        future = Future()
+        self.requests.put((X, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        """
+        Block until a request arrives, then gather the requests that follow it within the wait budget.
+
+        Returns:
+        - list: The (X, future, queued_at) tuples of the batch.
+        """
+        batch = [self.requests.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """
+        Predict queued requests batch by batch for the lifetime of the process.
+
+        Returns:
+        - None
+        """
+        while True:
+            batch = self._collect()
+            try:
+                X = pd.concat([x for x, _, _ in batch])
+                y_pred = self.forecaster.predict(X)
+            except Exception as error:
+                for _, future, _ in batch:
+                    future.set_exception(error)
+                continue
+            offset = 0
+            answered = time.perf_counter()
+            for x, future, _ in batch:
+                future.set_result(y_pred.iloc[offset:offset + len(x)])
+                offset += len(x)
+            self.stats.record_batch(len(X), [answered - queued_at for _, _, queued_at in batch])
@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+from joblib import dump, load
+from src.models.multi_horizon import stack_horizons
+
+NATIVE_FORMATS = {
+    'XGBRegressor': 'ubj',
+    'LGBMRegressor': 'txt',
+    'CatBoostRegressor': 'cbm'
+}
+
+
+def save_booster(booster, path):
+    """
+    Save a fitted booster in its native format.
+
+    Parameters:
+    - booster (object): Fitted XGBRegressor, LGBMRegressor or CatBoostRegressor.
+    - path (str): The file path; its extension must match NATIVE_FORMATS.
+
+    Returns:
+    - None
+    """
+    if type(booster).__name__ == 'LGBMRegressor':
+        booster.booster_.save_model(path)
+    else:
+        booster.save_model(path)
+
+
+def load_booster(name, path):
+    """
+    Load a booster saved by save_booster.
+
+    Parameters:
+    - name (str): The booster class name (a key of NATIVE_FORMATS).
+    - path (str): The file path.
+
+    Returns:
+    - object: A model exposing predict(X). LightGBM models are returned as lightgbm.Booster.
+    """
+    if name == 'XGBRegressor':
+        from xgboost import XGBRegressor
+        booster = XGBRegressor()
+        booster.load_model(path)
+        return booster
+    elif name == 'LGBMRegressor':
+        from lightgbm import Booster
+        return Booster(model_file=path)
+    elif name == 'CatBoostRegressor':
+        from catboost import CatBoostRegressor
+        booster = CatBoostRegressor()
+        booster.load_model(path)
+        return booster
+    raise ValueError(f'{name} has no native format, expected one of {list(NATIVE_FORMATS)}')
+
+
+def pipeline_boosters(pipeline):
+    """
+    Split the fitted multi-output step of a pipeline into its boosters.
+
+    Parameters:
+    - pipeline (Pipeline): A fitted pipeline_build pipeline.
+
+    Returns:
+    - tuple: The multi-output strategy, the fitted boosters and the number of horizon steps.
+    """
+    algorithm = pipeline.named_steps['algorithm']
+    if type(algorithm).__name__ == 'NativeMultiOutputRegressor':
+        return 'native', [algorithm.estimator_], None
+    elif type(algorithm).__name__ == 'HorizonStackedRegressor':
+        return 'stacked', [algorithm.estimator_], algorithm.horizon_
+    return 'separate', list(algorithm.estimators_), len(algorithm.estimators_)
+
+
+class RegisteredPipeline:
+    def __init__(self, directory, entry, mmap=False):
+        """
+        Initialize the RegisteredPipeline class.
+
+        The preprocessing state and the boosters of a registered fold are only read from disk on the first predict call.
+
+        Parameters:
+        - directory (str): Directory of the model in the registry.
+        - entry (dict): The index entry of the fold.
+        - mmap (bool): If True, the arrays of the preprocessing state are memory-mapped instead of read.
+
+        Returns:
+        - None
+        """
+        self.directory = directory
+        self.entry = entry
+        self.mmap = mmap
+        self.preprocessor = None
+        self.boosters = None
+
+    def load(self):
+        """
+        Read the preprocessing state and the boosters of the fold if they are not loaded yet.
+
+        Returns:
+        - RegisteredPipeline: The pipeline itself.
+        """
+        if self.boosters is None:
+            self.preprocessor = load(os.path.join(self.directory, self.entry['preprocessor']),
+                                     mmap_mode='r' if self.mmap else None)
+            self.boosters = [load_booster(self.entry['model'], os.path.join(self.directory, x))
+                             for x in self.entry['boosters']]
+        return self
+
+    def predict(self, X):
+        """
+        Predict every horizon step, as the fitted pipeline it was registered from.
+
+        Parameters:
+        - X (pd.DataFrame): Feature rows.
+
+        Returns:
+        - np.ndarray: Predictions with one column per horizon step.
+        """
+        self.load()
+        Xt = self.preprocessor.transform(X)
+        if self.entry['strategy'] == 'native':
+            return np.asarray(self.boosters[0].predict(Xt)).reshape(Xt.shape[0], -1)
+        elif self.entry['strategy'] == 'stacked':
+            y_pred = np.asarray(self.boosters[0].predict(stack_horizons(Xt, self.entry['horizon'])))
+            return y_pred.reshape(self.entry['horizon'], -1).T
+        return np.column_stack([np.asarray(booster.predict(Xt)) for booster in self.boosters])
+
+
+class ModelRegistry:
+    def __init__(self, root):
+        """
+        Initialize the ModelRegistry class.
+
+        Every fold of a model is stored under <root>/<model>/<fold>/ as an uncompressed joblib file of the fitted
+        preprocessing step and one native booster file per horizon model (XGBoost UBJ, LightGBM text, CatBoost .cbm).
+        <root>/index.json records the files, the strategy and the metadata of every fold.
+
+        Parameters:
+        - root (str): Directory of the registry.
+
+        Returns:
+        - None
+        """
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+
+    def index(self):
+        """
+        Read the metadata index.
+
+        Returns:
+        - dict: The fold entries of every registered model, keyed by model name and fold number.
+        """
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path) as handle:
+            return json.load(handle)
+
+    def has(self, model_name):
+        """
+        Check whether a model has registered folds.
+
+        Parameters:
+        - model_name (str): The model name.
+
+        Returns:
+        - bool: True if at least one fold of the model is registered.
+        """
+        return bool(self.index().get(model_name))
+
+    def register(self, model_name, fold, pipeline, metadata=None):
+        """
+        Store a fitted fold pipeline in native formats and add it to the index.
+
+        Parameters:
+        - model_name (str): The model name (a key of NATIVE_FORMATS).
+        - fold (int): The fold number.
+        - pipeline (Pipeline): The fitted pipeline.
+        - metadata (dict, optional): Extra JSON-serializable information stored with the entry (e.g. scores).
+
+        Returns:
+        - dict: The index entry of the fold.
+        """
+        strategy, boosters, horizon = pipeline_boosters(pipeline)
+        fold_dir = os.path.join(model_name, str(fold))
+        shutil.rmtree(os.path.join(self.root, fold_dir), ignore_errors=True)
+        os.makedirs(os.path.join(self.root, fold_dir), exist_ok=True)
+        preprocessor = os.path.join(fold_dir, 'preprocessor.joblib')
+        dump(pipeline.named_steps['preprocessor'], os.path.join(self.root, preprocessor))
+        booster_files = []
+        for i, booster in enumerate(boosters):
+            booster_files.append(os.path.join(fold_dir, f'booster_{i}.{NATIVE_FORMATS[model_name]}'))
+            save_booster(booster, os.path.join(self.root, booster_files[-1]))
+        entry = {'model': model_name, 'fold': fold, 'strategy': strategy, 'horizon': horizon,
+                 'preprocessor': preprocessor, 'boosters': booster_files, 'created': time.time(),
+                 'metadata': metadata or {}}
+        index = self.index()
+        index.setdefault(model_name, {})[str(fold)] = entry
+        self._write_index(index)
+        return entry
+
+    def reset(self, model_name):
+        """
+        Remove every registered fold of a model, so that a new training run never leaves folds of an earlier run behind.
+
+        Parameters:
+        - model_name (str): The model name.
+
+        Returns:
+        - None
+        """
+        shutil.rmtree(os.path.join(self.root, model_name), ignore_errors=True)
+        index = self.index()
+        if index.pop(model_name, None) is not None:
+            self._write_index(index)
+
+    def _write_index(self, index):
+        """
+        Atomically replace the metadata index.
+
+        Parameters:
+        - index (dict): The fold entries of every registered model.
+
+        Returns:
+        - None
+        """
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'w') as handle:
+            json.dump(index, handle, indent=2, default=str)
+        os.replace(tmp_path, self.index_path)
+
+    def load(self, model_name, folds=None, mmap=False):
+        """
+        Return the registered folds of a model; their files are read lazily on first use.
+
+        Parameters:
+        - model_name (str): The model name.
+        - folds (list, optional): Fold numbers to return. Defaults to None, which returns every registered fold.
+        - mmap (bool, optional): Memory-map the arrays of the preprocessing state. Defaults to False.
+
+        Returns:
+        - list: RegisteredPipeline objects, ordered by fold number.
+        """
+        entries = self.index().get(model_name, {})
+        selected = sorted(int(x) for x in entries if folds is None or int(x) in folds)
+        if not selected:
+            raise FileNotFoundError(f'No registered fold of {model_name} in {self.root}')
+        return [RegisteredPipeline(self.root, entries[str(i)], mmap) for i in selected]
@@ -0,0 +1,138 @@
+import numpy as np
+from scipy import sparse
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from src.models.early_stopping import early_stopping_fit_params
+
+
+def stack_horizons(X, horizon):
+    """
+    Repeat the feature rows for every horizon step and append the step index as the last column.
+
+    Parameters:
+    - X (array-like or sparse matrix): Preprocessed features.
+    - horizon (int): Number of horizon steps.
+
+    Returns:
+    - array-like or sparse matrix: Stacked features ordered step by step.
+    """
+    horizon_col = np.repeat(np.arange(horizon), X.shape[0]).reshape(-1, 1)
+    if sparse.issparse(X):
+        return sparse.hstack([sparse.vstack([X] * horizon), horizon_col]).tocsr()
+    return np.hstack([np.vstack([X] * horizon), horizon_col])
+
+
+class NativeMultiOutputRegressor(BaseEstimator, RegressorMixin):
+    def __init__(self, estimator):
+        """
+        Initialize the NativeMultiOutputRegressor class.
+
+        A single booster is fitted on every horizon step at once with its native multi-target support
+        (CatBoost MultiRMSE, XGBoost multi-output trees). Only CatBoost grows one tree for all steps; XGBoost 1.6 still
+        grows one tree per step inside the single booster, so it saves the per-step data copies and fit calls but not the
+        tree building (use 'stacked' for a single XGBoost model).
+
+        Parameters:
+        - estimator (object): CatBoostRegressor or XGBRegressor instance.
+
+        Returns:
+        - None
+        """
+        self.estimator = estimator
+
+    def fit(self, X, y, X_val=None, y_val=None, early_stopping_rounds=None):
+        """
+        Fit the booster on the full multi-step target.
+
+        Parameters:
+        - X (array-like): Preprocessed training features.
+        - y (pd.DataFrame): Target with one column per horizon step.
+        - X_val (array-like, optional): Preprocessed validation features used for early stopping.
+        - y_val (pd.DataFrame, optional): Validation target used for early stopping.
+        - early_stopping_rounds (int, optional): Rounds without validation improvement before stopping.
+
+        Returns:
+        - NativeMultiOutputRegressor: The fitted regressor.
+        """
+        name = type(self.estimator).__name__
+        if name not in ('CatBoostRegressor', 'XGBRegressor'):
+            raise ValueError(f"{name} has no native multi-output objective, use the 'stacked' strategy instead.")
+        self.estimator_ = clone(self.estimator)
+        if name == 'CatBoostRegressor':
+            self.estimator_.set_params(loss_function='MultiRMSE')
+            # MultiRMSE defaults to the Bayesian bootstrap, which rejects a subsample fraction.
+            params = self.estimator_.get_params()
+            if params.get('subsample') is not None and params.get('bootstrap_type') is None:
+                self.estimator_.set_params(bootstrap_type='Bernoulli')
+        elif self.estimator_.get_params().get('tree_method') is None:
+            self.estimator_.set_params(tree_method='hist')
+        fit_params = {}
+        if early_stopping_rounds and X_val is not None:
+            fit_params = early_stopping_fit_params(self.estimator_, X_val, np.asarray(y_val), early_stopping_rounds)
+        self.estimator_.fit(X, np.asarray(y), **fit_params)
+        return self
+
+    def predict(self, X):
+        """
+        Predict every horizon step.
+
+        Parameters:
+        - X (array-like): Preprocessed features.
+
+        Returns:
+        - np.ndarray: Predictions with one column per horizon step.
+        """
+        return np.asarray(self.estimator_.predict(X)).reshape(X.shape[0], -1)
+
+
+class HorizonStackedRegressor(BaseEstimator, RegressorMixin):
+    def __init__(self, estimator):
+        """
+        Initialize the HorizonStackedRegressor class.
+
+        The feature rows are repeated once per horizon step with the step index appended as an extra feature, so a single
+        model of any regressor type learns every horizon step.
+
+        Parameters:
+        - estimator (object): Regression algorithm object.
+
+        Returns:
+        - None
+        """
+        self.estimator = estimator
+
+    def fit(self, X, y, X_val=None, y_val=None, early_stopping_rounds=None):
+        """
+        Fit a single model on the horizon-stacked data.
+
+        Parameters:
+        - X (array-like): Preprocessed training features.
+        - y (pd.DataFrame): Target with one column per horizon step.
+        - X_val (array-like, optional): Preprocessed validation features used for early stopping.
+        - y_val (pd.DataFrame, optional): Validation target used for early stopping.
+        - early_stopping_rounds (int, optional): Rounds without validation improvement before stopping.
+
+        Returns:
+        - HorizonStackedRegressor: The fitted regressor.
+        """
+        y = np.asarray(y)
+        self.horizon_ = y.shape[1]
+        self.estimator_ = clone(self.estimator)
+        fit_params = {}
+        if early_stopping_rounds and X_val is not None:
+            fit_params = early_stopping_fit_params(self.estimator_, stack_horizons(X_val, self.horizon_),
+                                                   np.asarray(y_val).T.ravel(), early_stopping_rounds)
+        self.estimator_.fit(stack_horizons(X, self.horizon_), y.T.ravel(), **fit_params)
+        return self
+
+    def predict(self, X):
+        """
+        Predict every horizon step.
+
+        Parameters:
+        - X (array-like): Preprocessed features.
+
+        Returns:
+        - np.ndarray: Predictions with one column per horizon step.
+        """
+        y_pred = np.asarray(self.estimator_.predict(stack_horizons(X, self.horizon_)))
+        return y_pred.reshape(self.horizon_, -1).T
@@ -0,0 +1,46 @@
+import os
+from sklearn.base import clone
+
+THREAD_PARAMS = {
+    'XGBRegressor': 'n_jobs',
+    'LGBMRegressor': 'n_jobs',
+    'CatBoostRegressor': 'thread_count'
+}
+
+
+def split_thread_budget(thread_budget, n_workers, horizon_jobs=1):
+    """
+    This function divides a global thread budget between the concurrent fold workers and the horizon models each worker
+    fits at the same time.
+
+    Parameters:
+
+    thread_budget (int): The total number of threads; None uses every core.
+    n_workers (int): The number of folds fitted concurrently.
+    horizon_jobs (int, optional): The number of horizon models each worker fits concurrently. Defaults to 1.
+    Returns:
+
+    n_threads (int): The number of threads every single booster may use (at least 1).
+    """
+    thread_budget = thread_budget or os.cpu_count() or 1
+    return max(1, int(thread_budget) // (max(1, n_workers) * max(1, horizon_jobs)))
+
+
+def limit_threads(alg, n_threads):
+    """
+    This function returns a copy of a booster whose native thread count is capped.
+
+    Parameters:
+
+    alg (object): The XGBRegressor, LGBMRegressor or CatBoostRegressor instance.
+    n_threads (int): The number of threads the booster may use.
+    Returns:
+
+    alg (object): The unfitted copy with the thread parameter set; other estimators are returned unchanged.
+    """
+    param = THREAD_PARAMS.get(type(alg).__name__)
+    if param is None:
+        return alg
+    alg = clone(alg)
+    alg.set_params(**{param: n_threads})
+    return alg
@@ -1,12 +1,20 @@
 import pandas as pd
-from src.data.preprocess_data import pipeline_build
+from joblib import Parallel, delayed, effective_n_jobs, parallel_backend
+from threadpoolctl import threadpool_limits
+from src.data.preprocess_data import algorithm_build, fit_algorithm, fold_indexer
+from src.models.fold_cache import FoldMatrixCache
 from src.models.metrics import metrics_calculate
+from src.models.thread_budget import split_thread_budget, limit_threads
 from src.visualization.visualization import pred_visualize
 import os
+import re
+import json
 from joblib import dump
 
 class Trainer:
-    def __init__(self, X, y, fold_list, horizon, num_cols, cat_cols, alg,timestamp_column,unique_col,target,saved_model_path):
+    def __init__(self, X, y, fold_list, horizon, num_cols, cat_cols, alg,timestamp_column,unique_col,target,saved_model_path,
+                 multi_output_strategy='separate', fold_cache=None, registry=None, n_jobs=1, horizon_jobs=1,
+                 thread_budget=None, early_stopping_rounds=None, feature_metadata=None):
         """
         Initialize the Trainer class.
 
@@ -22,6 +30,16 @@ class Trainer:
         - unique_col (str): Name of the column containing unique identifiers for time series.
         - target (str): Name of the target variable.
         - saved_model_path (str): Path to save trained models.
+        - multi_output_strategy (str, optional): 'separate', 'native' or 'stacked' (see pipeline_build).
+        - fold_cache (FoldMatrixCache, optional): Preprocessed fold matrices to reuse; built from X, y and fold_list if None.
+        - registry (ModelRegistry, optional): If given, every fitted fold is also stored in native booster formats.
+        - n_jobs (int, optional): Number of folds fitted concurrently (-1 fits every fold at once).
+        - horizon_jobs (int, optional): Number of horizon models each fold fits concurrently ('separate' strategy).
+        - thread_budget (int, optional): Total number of threads shared by all boosters; None uses every core.
+        - early_stopping_rounds (int, optional): Booster early stopping rounds against each fold's early-stopping slice,
+          as used while tuning, so the fold models stop at the same point the tuning scores were measured at.
+        - feature_metadata (dict, optional): The feature settings of the training run (ADF/KPSS decisions, date encoding,
+          feature columns). Saved with the models so forecasts rebuild the same features (see load_feature_metadata).
 
         Returns:
         - None
@@ -37,10 +55,42 @@ class Trainer:
         self.timestamp_column = timestamp_column
         self.unique_col = unique_col
         self.target = target
+        self.multi_output_strategy = multi_output_strategy
+        self.fold_cache = FoldMatrixCache(X, y, fold_list, num_cols, cat_cols) if fold_cache is None else fold_cache
+        self.registry = registry
+        self.n_jobs = n_jobs
+        self.horizon_jobs = horizon_jobs
+        self.thread_budget = thread_budget
+        self.early_stopping_rounds = early_stopping_rounds
+        self.feature_metadata = feature_metadata
+
+    def fit_fold(self, i, alg):
+        """
+        Fit the multi-output regressor of a fold on its cached matrices, with the same early stopping as the tuning
+        trials, and predict its validation slice. Early stopping uses the held-out tail of the train slice, so the
+        validation slice only scores the model.
+
+        Parameters:
+        - i (int): The fold number.
+        - alg (object): Regression algorithm object with its thread count already limited.
+
+        Returns:
+        - tuple: The fitted multi-output regressor and its validation predictions.
+        """
+        fold = self.fold_cache.get(i)
+        algorithm = algorithm_build(alg, self.multi_output_strategy, self.horizon_jobs)
+        with parallel_backend('threading', n_jobs=self.horizon_jobs):
+            fit_algorithm(algorithm, fold['X_train'], fold['y_train'], fold['X_stop'], fold['y_stop'],
+                          self.early_stopping_rounds)
+        return algorithm, algorithm.predict(fold['X_val'])
 
     def train_and_visualization(self):
         """
         Train the regression model, save it, calculate scores, and visualize predictions.
+        The folds saved by an earlier run of the model are removed first, so forecasts only average the folds of this run.
+        Folds are fitted concurrently in threads when n_jobs is not 1, but never more folds than the fold cache keeps
+        (max_folds), so the workers do not evict each other's matrices; the thread budget is split between the fold
+        workers and their horizon models, and applied through the booster thread parameter and threadpool limits.
 
         Returns:
         - None
@@ -48,19 +98,37 @@ class Trainer:
         directory = os.path.join(self.saved_model_path)
         if not os.path.exists(os.path.join(directory, str(f'{type(self.alg).__name__}'))):
             os.makedirs(os.path.join(directory, str(f'{type(self.alg).__name__}')), exist_ok=True)
+        for saved in os.listdir(os.path.join(directory, type(self.alg).__name__)):
+            if re.fullmatch(r'\d+\.gz|features\.json', saved):
+                os.remove(os.path.join(directory, type(self.alg).__name__, saved))
+        if self.registry is not None:
+            self.registry.reset(type(self.alg).__name__)
+        if self.feature_metadata is not None:
+            with open(os.path.join(directory, type(self.alg).__name__, 'features.json'), 'w') as handle:
+                json.dump(self.feature_metadata, handle, indent=2)
+        n_workers = min(effective_n_jobs(self.n_jobs), len(self.fold_list),
+                        self.fold_cache.max_folds or len(self.fold_list))
+        n_threads = split_thread_budget(self.thread_budget, n_workers, self.horizon_jobs)
+        alg = limit_threads(self.alg, n_threads)
+        if n_workers > 1:
+            self.fold_cache.fit_all()
+        with threadpool_limits(limits=n_threads):
+            fitted = Parallel(n_jobs=n_workers, backend='threading')(
+                delayed(self.fit_fold)(i, alg) for i in range(len(self.fold_list)))
         for i in range(len(self.fold_list)):
-            train_indices = self.fold_list[i]['train']
-            val_indices = self.fold_list[i]['validation']
+            train_indices = fold_indexer(self.fold_list[i]['train'])
+            val_indices = fold_indexer(self.fold_list[i]['validation'])
             X_train = self.X.iloc[train_indices]
-            y_train = self.y.iloc[train_indices]
             X_val = self.X.iloc[val_indices]
             y_val = self.y.iloc[val_indices]
-            pipe = pipeline_build(self.alg, self.num_cols, self.cat_cols)
-            pipe.fit(X_train, y_train)
-            y_pred = pipe.predict(X_val)
+            algorithm, y_pred = fitted[i]
             model_name = os.path.join(f'{directory}/{str(type(self.alg).__name__)}/{str(i)}.gz')
-            dump(self.alg, model_name, compress=('gzip', 3))
+            pipeline = self.fold_cache.pipeline(i, algorithm)
+            dump(pipeline, model_name, compress=('gzip', 3))
             scores = metrics_calculate(y_val, y_pred, X_train)
+            if self.registry is not None:
+                self.registry.register(type(self.alg).__name__, i, pipeline,
+                                       {'scores': scores, 'features': self.feature_metadata})
             print(f"Fold {i + 1} Scores : {scores}")
             model_preds_columns_list = [[f'+{i + 1}_Horizon_time_step'][0] for i in range(self.horizon)]
             y_pred = pd.DataFrame(y_pred, index=X_val.index,
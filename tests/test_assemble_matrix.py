@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.preprocess_data import app_lag_data, app_derived_data, app_diff_data, split_data, build_final_data, \
+    split, assemble_matrix
+from src.features.feature_engineering import date_engineering
+
+COLS = ['Weekly_Sales', 'Temperature']
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-05', periods=30, freq='W')
+    index = pd.MultiIndex.from_product([dates, [1, 2, 3]], names=['Date', 'Store'])
+    data = pd.DataFrame({'Weekly_Sales': rng.normal(1e6, 2e5, len(index)),
+                         'Temperature': rng.normal(60, 15, len(index))}, index=index)
+    data = date_engineering(data.reset_index(), 'Date').set_index(['Date', 'Store'], drop=False)
+    return data.drop(['Date', 'Store'], axis=1)
+
+
+@pytest.mark.parametrize('isStationary_adf, isStationary_kpss', [(True, True), (False, False)])
+def test_assemble_matrix_matches_merge_and_split(panel, isStationary_adf, isStationary_kpss):
+    window, horizon = 4, 2
+    lagged_data = app_lag_data(panel, window, COLS, 'Store', 'Date')
+    derived_data = app_derived_data(panel, COLS, window, [4, 2], 'weeks', 604800, 'Store', 'Date')
+    data = split_data(panel, window, 3)
+    diff_data = None
+    if not isStationary_kpss:
+        diff_data = app_diff_data(data, window, lagged_data, derived_data, 'Weekly_Sales', 'weeks')
+    final_data = build_final_data(data, lagged_data, derived_data, 'Weekly_Sales', isStationary_adf, diff_data)
+    X_expected, y_expected = split(final_data, 'Weekly_Sales', horizon, 3)
+    X, y = assemble_matrix(data, [lagged_data, derived_data, diff_data], 'Weekly_Sales', isStationary_adf, horizon, 3,
+                           'float64')
+    pd.testing.assert_frame_equal(X, X_expected, check_exact=False, rtol=1e-9, check_dtype=False)
+    pd.testing.assert_frame_equal(y, y_expected, check_exact=False, rtol=1e-9)
+    numeric = X.select_dtypes(include=['number'])
+    assert (numeric.dtypes == np.float64).all()
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+from src.data.dataset_source import load_panel
+
+
+@pytest.fixture
+def unbalanced_csv(tmp_path):
+    data = pd.DataFrame({'Store': [1, 2, 1, 2, 1],
+                         'Date': ['05-02-2010', '05-02-2010', '12-02-2010', '12-02-2010', '19-02-2010'],
+                         'Weekly_Sales': [1.0, 2.0, 3.0, 4.0, 5.0]})
+    path = tmp_path / 'panel.csv'
+    data.to_csv(path, index=False)
+    return str(path)
+
+
+def test_load_panel_falls_back_to_series_column(unbalanced_csv):
+    df, unique_list = load_panel(unbalanced_csv, 'Date', '%d-%m-%Y', series_column='Store')
+    assert unique_list == ['Store']
+    assert len(df) == 5
+
+
+def test_load_panel_raises_without_series_column(unbalanced_csv):
+    with pytest.raises(ValueError, match='No series identifier'):
+        load_panel(unbalanced_csv, 'Date', '%d-%m-%Y')
@@ -0,0 +1,25 @@
+import pandas as pd
+from src.data.feature_store import FeatureStore
+
+
+def test_load_or_compute_reuses_stored_stage(tmp_path):
+    store = FeatureStore(str(tmp_path), 1024 ** 3)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return pd.DataFrame({'a': [value, value + 1.0]})
+
+    first = store.load_or_compute('lagged_data', 'abc', {'window': 4}, compute, 1.0)
+    second = store.load_or_compute('lagged_data', 'abc', {'window': 4}, compute, 1.0)
+    pd.testing.assert_frame_equal(first, second)
+    assert calls == [1.0]
+    store.load_or_compute('lagged_data', 'abc', {'window': 8}, compute, 2.0)
+    store.load_or_compute('lagged_data', 'abd', {'window': 4}, compute, 3.0)
+    assert calls == [1.0, 2.0, 3.0]
+
+
+def test_store_evicts_beyond_max_bytes(tmp_path):
+    store = FeatureStore(str(tmp_path), 1)
+    store.put('lagged_data', 'key', pd.DataFrame({'a': range(100)}))
+    assert store.get('lagged_data', 'key') is None
@@ -0,0 +1,57 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.preprocess_data import get_fold
+from src.models.fold_cache import FoldMatrixCache
+
+
+def panel(n_dates=40, n_series=3):
+    index = pd.MultiIndex.from_product([pd.date_range('2020-01-01', periods=n_dates, freq='W'), range(n_series)],
+                                       names=['Date', 'Store'])
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=len(index)), 'b': rng.normal(size=len(index))}, index=index)
+    y = pd.DataFrame({'y_1': rng.normal(size=len(index)), 'y_2': rng.normal(size=len(index))}, index=index)
+    return X, y
+
+
+@pytest.mark.parametrize('fraction', [0.1, 0.3])
+def test_early_stopping_slice_is_the_tail_of_train(fraction):
+    X, _ = panel()
+    for fold in get_fold(X, 3, 3, fraction):
+        assert len(fold['early_stopping']) > 0 and len(fold['early_stopping']) % 3 == 0
+        assert fold['train'][-1] + 1 == fold['early_stopping'][0]
+        assert fold['early_stopping'][-1] + 1 == fold['validation'][0]
+        assert not set(fold['early_stopping']) & set(fold['validation'])
+
+
+def test_no_early_stopping_slice_by_default():
+    X, y = panel()
+    fold_list = get_fold(X, 3, 3)
+    assert all(fold['early_stopping'] == [] for fold in fold_list)
+    fold = FoldMatrixCache(X, y, fold_list, ['a', 'b'], []).get(0)
+    assert fold['X_stop'] is None and fold['y_stop'] is None
+
+
+def test_fit_all_respects_max_folds():
+    X, y = panel()
+    cache = FoldMatrixCache(X, y, get_fold(X, 3, 3), ['a', 'b'], [], max_folds=1).fit_all()
+    assert list(cache.folds) == [2]
+    assert sorted(cache.preprocessors) == [0, 1, 2]
+    unbounded = FoldMatrixCache(X, y, get_fold(X, 3, 3), ['a', 'b'], []).fit_all()
+    np.testing.assert_array_equal(cache.get(0)['X_val'], unbounded.get(0)['X_val'])
+
+
+def test_threaded_lookups_share_one_fold():
+    X, y = panel()
+    cache = FoldMatrixCache(X, y, get_fold(X, 3, 3), ['a', 'b'], [])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        folds = list(pool.map(cache.get, [1] * 16))
+    assert all(fold is folds[0] for fold in folds)
+
+
+def test_cache_survives_pickling():
+    X, y = panel()
+    cache = pickle.loads(pickle.dumps(FoldMatrixCache(X, y, get_fold(X, 3, 3), ['a', 'b'], []).fit_all()))
+    assert cache.get(0)['X_train'].shape[0] == len(get_fold(X, 3, 3)[0]['train'])
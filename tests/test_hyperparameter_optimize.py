@@ -0,0 +1,17 @@
+import optuna
+import pytest
+from xgboost import XGBRegressor
+from src.models.hyperparameter_optimize import build_storage, build_study_name
+
+
+@pytest.mark.parametrize('file_name', ['optuna_journal.log', 'optuna.db'])
+def test_build_storage_creates_parent_directory(tmp_path, file_name):
+    storage = build_storage(str(tmp_path / 'models' / 'fresh' / file_name))
+    study = optuna.create_study(study_name='study', storage=storage)
+    assert study.study_name == 'study'
+
+
+def test_study_name_is_deterministic():
+    params = {'window': 50, 'horizon': 4}
+    assert build_study_name(XGBRegressor(), 'abc', params) == build_study_name(XGBRegressor(), 'abc', dict(params))
+    assert build_study_name(XGBRegressor(), 'abc', params) != build_study_name(XGBRegressor(), 'abd', params)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.preprocess_data import app_lag_data, app_derived_data, app_diff_data, split_data, build_final_data
+from src.features.incremental_features import IncrementalFeatureBuilder
+from src.models.forecaster import latest_features
+
+COLS = ['Weekly_Sales', 'Temperature']
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-05', periods=20, freq='W')
+    index = pd.MultiIndex.from_product([dates, [3, 1, 4, 2]], names=['Date', 'Store'])
+    return pd.DataFrame({'Weekly_Sales': rng.normal(1e6, 2e5, len(index)),
+                         'Temperature': rng.normal(60, 15, len(index))}, index=index)
+
+
+@pytest.mark.parametrize('window, window_list', [(4, [5, 2]), (8, [8, 3])])
+def test_update_matches_full_rebuild(panel, window, window_list):
+    dates = panel.index.get_level_values('Date')
+    history, new = panel[dates < dates[-16]], panel[dates >= dates[-16]]
+    builder = IncrementalFeatureBuilder(window, window_list, COLS, 'weeks', 604800, 'Store', 'Date').fit(history)
+    lagged_data, derived_data = builder.update(new)
+    full_lagged = app_lag_data(panel, window, COLS, 'Store', 'Date')
+    full_derived = app_derived_data(panel, COLS, window, window_list, 'weeks', 604800, 'Store', 'Date')
+    pd.testing.assert_frame_equal(lagged_data, full_lagged.loc[lagged_data.index], check_names=False)
+    pd.testing.assert_frame_equal(derived_data, full_derived.loc[derived_data.index], check_exact=False, rtol=1e-9,
+                                  check_names=False)
+    assert len(lagged_data) == len(new)
+
+
+@pytest.mark.parametrize('isStationary_adf, isStationary_kpss', [(True, True), (False, False)])
+def test_latest_features_match_full_pipeline(panel, isStationary_adf, isStationary_kpss):
+    window, window_list = 8, [8, 3]
+    latest = latest_features(panel, window, window_list, COLS, 'weeks', 604800, 'Store', 'Date', 'Weekly_Sales',
+                             isStationary_adf, isStationary_kpss=isStationary_kpss)
+    lagged_data = app_lag_data(panel, window, COLS, 'Store', 'Date')
+    derived_data = app_derived_data(panel, COLS, window, window_list, 'weeks', 604800, 'Store', 'Date')
+    data = split_data(panel, window, 4)
+    diff_data = None
+    if not isStationary_kpss:
+        diff_data = app_diff_data(data, window, lagged_data, derived_data, 'Weekly_Sales', 'weeks')
+    final_data = build_final_data(data, lagged_data, derived_data, 'Weekly_Sales', isStationary_adf, diff_data)
+    expected = final_data.groupby(level='Store').tail(1).sort_index().drop(['Weekly_Sales'], axis=1)
+    pd.testing.assert_frame_equal(latest, expected, check_exact=False, rtol=1e-9)
+
+
+def test_latest_features_keep_the_feature_dtype(panel):
+    latest = latest_features(panel, 8, [8, 3], COLS, 'weeks', 604800, 'Store', 'Date', 'Weekly_Sales', True,
+                             dtype='float32', isStationary_kpss=False)
+    features = latest.drop(COLS, axis=1, errors='ignore')
+    assert (features.dtypes == np.float32).all()
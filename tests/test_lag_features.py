@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.preprocess_data import app_lag_data, derived_lag_features, editing_index
+
+
+def baseline_lag_data(data, WINDOW, cols, series_id, datetime_feature):
+    # The original sliding-window loop, one derived_lag_features call per row of every series.
+    data_1 = data.reset_index()
+    lags = []
+    for seri in data_1[series_id].unique():
+        v = int(WINDOW) + 1
+        short = v < 7
+        data_4 = editing_index(data_1[data_1[series_id] == seri], datetime_feature, series_id)
+        for _ in range(len(data_4) - int(WINDOW)):
+            if short:
+                lags.append(derived_lag_features(data_4[v - int(WINDOW):v + 1].copy(), cols, lag_bound=WINDOW).dropna())
+            else:
+                lags.append(derived_lag_features(data_4[v - int(WINDOW):v][-6:].copy(), cols).dropna())
+            v += 1
+    lagged_data = pd.concat(lags)
+    # For short windows the loop runs one step past the end of each series and repeats its last row.
+    return lagged_data[~lagged_data.index.duplicated()].sort_index()
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-05', periods=16, freq='W')
+    index = pd.MultiIndex.from_product([dates, [3, 1, 4, 2]], names=['Date', 'Store'])
+    return pd.DataFrame({'Weekly_Sales': rng.normal(1e6, 2e5, len(index)),
+                         'Temperature': rng.normal(60, 15, len(index))}, index=index)
+
+
+@pytest.mark.parametrize('window', [3, 5, 6, 8])
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_lag_data_matches_baseline_loop(panel, window, n_jobs):
+    cols = ['Weekly_Sales', 'Temperature']
+    expected = baseline_lag_data(panel, window, cols, 'Store', 'Date')
+    result = app_lag_data(panel, window, cols, 'Store', 'Date', n_jobs=n_jobs)
+    pd.testing.assert_frame_equal(result, expected.astype('float64'), check_names=False)
@@ -0,0 +1,12 @@
+import numpy as np
+import pandas as pd
+from src.models.metrics import metrics_calculate
+
+
+def test_rmsle_is_nan_for_negative_predictions():
+    X_train = pd.DataFrame({'a': np.arange(10.0), 'b': np.arange(10.0)})
+    y_val = pd.DataFrame({'y_1': [1.0, 2.0, 3.0], 'y_2': [2.0, 3.0, 4.0]})
+    scores = metrics_calculate(y_val, y_val - 2.5, X_train)
+    assert np.isnan(scores['RMSLE'][0])
+    assert scores['RMSE'] == 2.5
+    assert not np.isnan(metrics_calculate(y_val, y_val + 1, X_train)['RMSLE'][0])
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from catboost import CatBoostRegressor
+from lightgbm import LGBMRegressor
+from xgboost import XGBRegressor
+from src.data.preprocess_data import pipeline_build
+from src.models.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=200), 'b': rng.normal(size=200), 'c': rng.choice(['x', 'y'], 200)})
+    y = pd.DataFrame({'y_1': X['a'] * 2 + rng.normal(size=200), 'y_2': X['b'] - X['a']})
+    return X, y
+
+
+@pytest.mark.parametrize('alg, strategy', [
+    (LGBMRegressor(n_estimators=20, verbosity=-1), 'separate'),
+    (XGBRegressor(n_estimators=20), 'stacked'),
+    (CatBoostRegressor(iterations=20, verbose=False, allow_writing_files=False), 'native')
+])
+def test_registered_fold_predicts_like_the_pipeline(tmp_path, data, alg, strategy):
+    X, y = data
+    pipeline = pipeline_build(alg, ['a', 'b'], ['c'], strategy).fit(X, y)
+    registry = ModelRegistry(str(tmp_path))
+    registry.register(type(alg).__name__, 0, pipeline, {'scores': {'RMSE': 1.0}})
+    loaded = registry.load(type(alg).__name__)
+    assert len(loaded) == 1
+    np.testing.assert_allclose(loaded[0].predict(X), pipeline.predict(X), rtol=1e-5)
+
+
+def test_reset_removes_every_fold(tmp_path, data):
+    X, y = data
+    pipeline = pipeline_build(LGBMRegressor(n_estimators=5, verbosity=-1), ['a', 'b'], ['c']).fit(X, y)
+    registry = ModelRegistry(str(tmp_path))
+    for fold in range(3):
+        registry.register('LGBMRegressor', fold, pipeline)
+    registry.reset('LGBMRegressor')
+    assert not registry.has('LGBMRegressor')
+    with pytest.raises(FileNotFoundError):
+        registry.load('LGBMRegressor')
@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+from src.models.multi_horizon import NativeMultiOutputRegressor
+
+
+def test_native_catboost_accepts_subsample():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 5))
+    y = pd.DataFrame(X[:, :1] + rng.normal(scale=.1, size=(200, 4)),
+                     columns=[f'+{i + 1}_Horizon_time_step' for i in range(4)])
+    estimator = CatBoostRegressor(n_estimators=20, subsample=.5, verbose=False, allow_writing_files=False)
+    model = NativeMultiOutputRegressor(estimator).fit(X[:150], y[:150], X[150:], y[150:], early_stopping_rounds=5)
+    assert model.estimator_.get_params()['bootstrap_type'] == 'Bernoulli'
+    assert model.predict(X[150:]).shape == (50, 4)
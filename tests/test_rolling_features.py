@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.preprocess_data import app_derived_data, derive_features, editing_index
+
+
+def baseline_derived_data(data, cols, WINDOW, window_list, time_type, frequency, series_id, datetime_feature):
+    # The original sliding-window loop, one derive_features call per row of every series.
+    data_1 = data.reset_index()
+    derives = []
+    for seri in data_1[series_id].unique():
+        v = int(WINDOW) + 1
+        short = v < 7
+        data_3 = editing_index(data_1[data_1[series_id] == seri], datetime_feature, series_id)
+        rows = []
+        for _ in range(len(data_3) - int(WINDOW)):
+            lower = v - int(WINDOW)
+            upper = v + 1 if short else v
+            rows.append(derive_features(data_3[lower:upper].copy(), cols, WINDOW, window_list, time_type,
+                                        frequency).iloc[-1].to_frame().T)
+            v += 1
+        derives.append(pd.concat(rows))
+    derived_data = pd.concat(derives)
+    derived_data = derived_data.loc[:, derived_data.columns.str.contains('stat_')]
+    # For short windows the loop runs one step past the end of each series and repeats its last row.
+    derived_data = derived_data[~derived_data.index.duplicated()]
+    return derived_data.astype('float64').sort_index()
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-05', periods=16, freq='W')
+    index = pd.MultiIndex.from_product([dates, [3, 1, 4, 2]], names=['Date', 'Store'])
+    return pd.DataFrame({'Weekly_Sales': rng.normal(1e6, 2e5, len(index)),
+                         'Temperature': rng.normal(60, 15, len(index))}, index=index)
+
+
+@pytest.mark.parametrize('window, window_list', [(4, [5, 4, 2]), (8, [8, 5, 3])])
+def test_derived_data_matches_baseline_loop(panel, window, window_list):
+    cols = ['Weekly_Sales', 'Temperature']
+    expected = baseline_derived_data(panel, cols, window, window_list, 'weeks', 604800, 'Store', 'Date')
+    result = app_derived_data(panel, cols, window, window_list, 'weeks', 604800, 'Store', 'Date')
+    assert result.notna().any().all()
+    pd.testing.assert_frame_equal(result, expected[result.columns], check_exact=False, rtol=1e-7, check_names=False)
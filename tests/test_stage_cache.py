@@ -0,0 +1,25 @@
+import numpy as np
+from src.data.stage_cache import StageCache
+
+
+def test_get_or_compute_memoizes_per_params():
+    cache = StageCache(1024 ** 2)
+    calls = []
+
+    def compute(n):
+        calls.append(n)
+        return np.zeros(n)
+
+    cache.get_or_compute('stage', 'abc', {'n': 10}, compute, 10)
+    cache.get_or_compute('stage', 'abc', {'n': 10}, compute, 10)
+    cache.get_or_compute('stage', 'abc', {'n': 20}, compute, 20)
+    assert calls == [10, 20]
+
+
+def test_cache_stays_within_max_bytes():
+    cache = StageCache(1000)
+    for n in range(5):
+        cache.get_or_compute('stage', 'abc', {'n': n}, np.zeros, 50)
+    assert cache.cache.currsize <= 1000
+    cache.get_or_compute('stage', 'abc', {'n': 'big'}, np.zeros, 1000)
+    assert cache.cache.currsize <= 1000
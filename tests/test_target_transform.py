@@ -0,0 +1,11 @@
+import numpy as np
+import pandas as pd
+from src.data.preprocess_data import trend_removal_log
+
+
+def test_trend_removal_log_is_sign_preserving():
+    data = pd.DataFrame({'Weekly_Sales_lag_1': [-9.0, 0.0, 9.0], 'Temperature': [1.0, 2.0, 3.0]})
+    result = trend_removal_log(data, ['Weekly_Sales_lag_1'])
+    assert result.columns.tolist() == ['Weekly_Sales_lag_1_log', 'Temperature']
+    np.testing.assert_allclose(result['Weekly_Sales_lag_1_log'], [-np.log1p(9.0), 0.0, np.log1p(9.0)])
+    pd.testing.assert_series_equal(result['Temperature'], data['Temperature'])